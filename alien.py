@@ -1,4 +1,3 @@
-import pygame
 from pygame.sprite import Sprite
 
 class Alien(Sprite):
@@ -11,7 +10,9 @@ class Alien(Sprite):
         self.settings = ai_game.settings
 
         # Load the alien image and set its rect attribute.
-        self.image = pygame.image.load('images/alien.bmp')
+        # The surface comes from the shared asset cache, so the bitmap is
+        # only decoded once no matter how many aliens are in the fleet.
+        self.image = ai_game.assets.load_image('images/alien.bmp')
         self.rect =self.image.get_rect()
 
         # Start each new alien near the top left of the screen.
@@ -26,19 +27,6 @@ class Alien(Sprite):
         # so we’ll track the horizontal position of each alien precisely
         self.x = float(self.rect.x)
 
-    # We can call the new method check_edges() on any alien to see 
-    # whether it’s at the left or right edge
-    # 
-    def check_edges(self):
-        """Return True if alien is at edge of screen."""
-        screen_rect = self.screen.get_rect()
-
-        # The alien is at the right edge if the right attribute 
-        # of its rect is greater than or equal to the right attribute of the screen’s rect. 
-        # It’s at the left edge if its left value is less than or equal to 0 .
-        if self.rect.right >= screen_rect.right or self.rect.left <= 0:
-            return True
-
     # We create a settings parameter in __init__() so 
     # we can access the alien’s speed in update().
     # Each time we update an alien’s position, we move it to the right by the amount stored in alien_speed.
@@ -51,7 +39,9 @@ class Alien(Sprite):
         # If fleet _direction is 1, the value of alien_speed will be added to the alien’s current position,
         # moving the alien to the right; if fleet_direction is −1, the value will be subtracted from the alien’s position,
         # moving the alien to the left.
-        self.x += (self.settings.alien_speed * self.settings.fleet_direction)
+        # alien_speed is in pixels per second, so we scale it by the length of one tick.
+        self.x += (self.settings.alien_speed * self.settings.time_step
+            * self.settings.fleet_direction)
 
         # We then use the value of self.x to update
         # the position of the alien’s rect
@@ -1,37 +1,153 @@
 import sys 
-from time import sleep
+import os
+import random
+from time import perf_counter
 import pygame
 from settings import Settings
 from game_stats import GameStats
-from scoreboard import Scoreboard
-from button import Button
 from ship import Ship
-from bullet import Bullet
+from bullet import BulletPool
 from alien import Alien
+from assets import AssetCache
+from fleet import FleetBounds, VectorFleet, fleet_layout
+from collisions import SpatialHash
+from keymap import KeyMap
+
+# Only what every game needs is imported up front. The scoreboard, button,
+# profiler, renderer, score store, recorder and profile loader are imported
+# where they're first used, so a game that doesn't use them never pays to
+# load them, and the rest pay after the first frame is already on screen.
+
+# What the loading screen waits for: the images the sprites are made from.
+# The game only draws with pygame's own default font, which needs no lookup.
+PRELOAD_IMAGES = ('images/ship.bmp', 'images/alien.bmp')
 
 class AlienInvasion:
     """Overall class to manage game assets and behavior."""
 
-    def __init__(self):
+    def __init__(self, headless=False, settings=None):
         """Initialize the game , and create the game resources."""
+        self._started = perf_counter()
+
+        # A headless game never opens a window. SDL's dummy video driver
+        # still gives us a working event queue and mouse module.
+        self.headless = headless
+        if self.headless:
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
         pygame.init()
 
         # create an instance of Settings and assign it to self.settings
-        self.settings = Settings()
-
-        #  we use the screen_width and screen_height attributes of self.settings
-        # we set the full screen mode 
-        self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-        self.settings.screen_width = self.screen.get_rect().width
-        self.settings.screen_height = self.screen.get_rect().height
+        # unless the caller has already prepared one.
+        if settings is None:
+            settings = Settings()
+        self.settings = settings
+
+        if self.headless:
+            # Draw to an off-screen surface the size given in settings.
+            self.screen = pygame.Surface(
+                (self.settings.screen_width, self.settings.screen_height))
+        else:
+            #  we use the screen_width and screen_height attributes of self.settings
+            # we set the full screen mode 
+            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            self.settings.screen_width = self.screen.get_rect().width
+            self.settings.screen_height = self.screen.get_rect().height
 
         pygame.display.set_caption("ALien Invasion")
+
+        # Images are loaded once through this cache and shared by every
+        # sprite that needs them, converted to the screen's pixel format so
+        # a headless game draws the same surfaces a windowed one does.
+        self.assets = AssetCache(self.screen)
         
         # Create an instance to store game statistics.
         
         self.stats = GameStats(self)
 
+        # Keys are looked up in the keymap to find the action they trigger,
+        # and each action and event type has its handler in a table.
+        self.keymap = KeyMap(self.settings.key_bindings)
+        self._action_handlers = {
+            'move_left': self._move_left,
+            'move_right': self._move_right,
+            'fire': self._fire,
+            'quit': self._quit,
+            'play': self._play,
+            }
+        self._event_handlers = {
+            pygame.QUIT: lambda event: self.perform_action('quit'),
+            pygame.KEYDOWN: self._check_keydown_events,
+            pygame.KEYUP: self._check_keyup_events,
+            pygame.MOUSEBUTTONDOWN: self._check_mouse_events,
+            pygame.WINDOWEXPOSED: self._check_expose_events,
+            }
+
+        # Block every other event type so mouse motion and the like never
+        # reach the queue at all.
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(self._event_handlers))
+
+        # On a real display, only the parts of the screen that changed are
+        # repainted and pushed each frame. The renderer is made once the
+        # game has loaded.
+        self.renderer = None
+
+        # Ticks left in the pause after the ship is hit. While it counts
+        # down, events are still handled and the screen is still drawn;
+        # only the simulation holds still.
+        self.pause_ticks = 0
+
+        # The number of simulation ticks run so far. Recorded input is
+        # stamped with it so a replay can hand events back at the same tick.
+        self.ticks = 0
+        self.recorder = None
+
+        # Set to a ProfileWatcher to pick up changes to the settings file
+        # between frames.
+        self.watcher = None
+
+        # Finished games are saved to disk so the high score survives a
+        # restart. The store loads in the background; _check_score_store()
+        # picks up the saved high score once it's ready. Headless runs
+        # leave the store alone.
+        self.scores = None
+        if self.settings.score_store and not self.headless:
+            from score_store import ScoreStore
+            self.scores = ScoreStore(self.settings.score_store,
+                self.settings.leaderboard_size)
+
+        # Per-frame timings are only recorded when profiling is switched on.
+        # Otherwise profiler stays None and each phase costs one test.
+        self.profiler = None
+        if self.settings.profile:
+            from profiler import FrameProfiler
+            self.profiler = FrameProfiler(self.settings.profile_frames,
+                self.assets)
+
+        # Seconds from here to the first frame on screen and to the first
+        # frame that responds to input.
+        self.startup = {}
+
+        # A headless game has nobody waiting on it, so it loads everything
+        # straight away. A windowed one shows a loading screen at once and
+        # decodes images in the background; run_game() builds the rest of
+        # the game when they're ready.
+        self.loaded = False
+        if self.headless:
+            self._finish_loading()
+        else:
+            self.assets.preload(PRELOAD_IMAGES)
+            self._draw_loading_screen()
+            self.startup['first_frame'] = perf_counter() - self._started
+
+    # helper method
+    def _finish_loading(self):
+        """Create the game resources that need the loaded assets."""
+        self.assets.wait_for_preload()
+
         # and create an instance for scoreboard.
+        from scoreboard import Scoreboard
         self.sb = Scoreboard(self)
 
         # make an instance of Ship after the screen has been created The self argument here refers to the current instance of AlienInvasion
@@ -39,67 +155,236 @@ class AlienInvasion:
         # such as the screen object. We assign this Ship instance to self.ship.
         self.ship = Ship(self)
 
-        # This group will be an instance of the pygame.sprite.Group class,
-        # which behaves like a list with some extra 
-        # functionality that’s helpful when building games
-        self.bullets = pygame.sprite.Group()
+        # The bullets are a pool that reuses the same few objects, but it
+        # can be drawn, emptied and collided just like a group.
+        self.bullets = BulletPool(self)
 
-        self.aliens  = pygame.sprite.Group()
+        # The fleet is either a plain sprite group or, when NumPy is
+        # available and asked for, a group that moves aliens in bulk.
+        # Formations are always moved in bulk if they can be.
+        self.vector_fleet = ((self.settings.fleet_backend == 'numpy'
+            or bool(self.settings.formations)) and VectorFleet.available())
+        if self.vector_fleet:
+            self.aliens = VectorFleet(self)
+        else:
+            self.aliens  = pygame.sprite.Group()
 
-        self._create_fleet()
+        # The aliens reused from one fleet to the next, kept with the
+        # layout they were made for under the layout's id().
+        self._alien_pools = {}
+
+        # A grid over the fleet so each bullet is only tested against the
+        # aliens near it rather than against the whole fleet.
+        self.broadphase = SpatialHash()
+
+        # The live fleet's outermost columns and lowest row, kept up to date
+        # as aliens die, so edge and bottom checks don't visit every alien.
+        self.fleet_bounds = FleetBounds(self)
+
+        # The fleet itself is built lazily: by the first game, or on the
+        # frame after the game first responds to input.
+        self._fleet_pending = True
 
         # Make the Play button.
         # This code creates an instance of Button with the label Play 
         # but it doesn’t draw the button to the screen.
+        from button import Button
         self.play_button = Button(self, "Play")
 
+        if self.settings.dirty_rects and not self.headless:
+            from renderer import DirtyRectRenderer
+            self.renderer = DirtyRectRenderer(self)
+        self.loaded = True
+
+    # helper method
+    def _draw_loading_screen(self):
+        """Draw a progress bar while the assets load."""
+        self.screen.fill(self.settings.bg_color)
 
+        # An outlined bar in the middle of the screen fills up as the
+        # background thread works through the assets. No font is needed.
+        outline = pygame.Rect(0, 0, 400, 24)
+        outline.center = self.screen.get_rect().center
+        bar = outline.inflate(-8, -8)
+        bar.width = round(bar.width * self.assets.progress)
+        self.screen.fill((30, 30, 30), outline)
+        self.screen.fill(self.settings.bg_color, outline.inflate(-4, -4))
+        self.screen.fill((0, 255, 0), bar)
+        pygame.display.flip()
+
+    # helper method
+    def _wait_for_assets(self, clock):
+        """Keep the loading screen up until the assets are ready."""
+        while not self.assets.preloaded.is_set():
+            # Only quitting means anything before the game has loaded.
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN
+                        and self.keymap.action_for(event.key) == 'quit'):
+                    self._quit_game()
+            self._draw_loading_screen()
+            clock.tick(self.settings.max_fps)
 
     # It’s easy to see that we’re looking for new events and updating the screen on each pass through the loop.
     def run_game(self):
         """Start the main loop for the game."""
+        # The clock caps how often we draw and tells us how much real time
+        # has passed; lag collects that time until it's enough for a tick.
+        clock = pygame.time.Clock()
+        if not self.loaded:
+            self._wait_for_assets(clock)
+            self._finish_loading()
+
+        lag = 0.0
         while True:
+            # clock.tick() sleeps just long enough to hold max_fps, so the
+            # loop no longer spins a core at 100%.
+            frame_time = clock.tick(self.settings.max_fps) / 1000
+            lag += min(frame_time, self.settings.max_frame_time)
+
+            prof = self.profiler
+            if prof:
+                prof.begin_frame()
+
+            # A changed settings file is picked up here, between frames.
+            if self.watcher:
+                profile = self.watcher.poll()
+                if profile:
+                    self.reload_profile(profile)
+
             # Watch for keyboard and mouse events by using _check_events method and _update_screen and ship.update 
             self._check_events()
+            if prof:
+                prof.mark('events')
+
+            # Advance the simulation in fixed steps, so the game runs at the
+            # same speed on every machine no matter how fast it draws.
+            while lag >= self.settings.time_step:
+                self._tick()
+                lag -= self.settings.time_step
 
-            if self.stats.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
+            if self.scores:
+                self._check_score_store()
 
             self._update_screen()
+            if prof:
+                prof.end_frame(len(self.aliens), len(self.bullets))
+
+            # The first frame drawn after loading is the first one that
+            # answers input. The idle fleet is only built after it.
+            if 'interactive' not in self.startup:
+                self.startup['interactive'] = perf_counter() - self._started
+                if prof:
+                    prof.startup = self.startup
+            elif self._fleet_pending:
+                self._create_fleet()
+
+    def run_frames(self, frames, render=False):
+        """Run up to frames ticks as fast as possible and return the stats."""
+        # This is the entry point for batch runs: there's no clock and no
+        # input, just the simulation stepping until it runs out of frames
+        # or the player runs out of ships. The game is started as if Play
+        # were pressed, so a recording of the run knows it started.
+        if not self.stats.game_active:
+            self.perform_action('play')
+
+        prof = self.profiler
+        for _ in range(frames):
+            if not self.stats.game_active:
+                break
+            if prof:
+                prof.begin_frame()
+            self._tick()
+            if render:
+                self._update_screen()
+            if prof:
+                prof.end_frame(len(self.aliens), len(self.bullets))
+
+        return self.stats
+
+    def reload_profile(self, profile):
+        """Switch to a new settings profile without restarting."""
+        # Settings baked into the screen and surfaces keep their current
+        # values, so the active profile says what's really in effect.
+        from profiles import RESTART_FIELDS
+        current = self.settings.active_profile
+        profile = profile._replace(**{name: getattr(current, name)
+            for name in RESTART_FIELDS})
+        self.settings.apply_profile(profile)
+        if self.renderer:
+            self.renderer.invalidate()
+
+    # helper method
+    def _check_score_store(self):
+        """Show the saved high score once the store has loaded."""
+        if self.scores.high_score > self.stats.high_score:
+            self.stats.high_score = self.scores.high_score
+            self.sb.prep_high_score()
+
+    # helper method
+    def _tick(self):
+        """Advance the game by one fixed time step."""
+        self.ticks += 1
+        if self.pause_ticks:
+            self.pause_ticks -= 1
+            return
+
+        if self.stats.game_active:
+            prof = self.profiler
+            self.ship.update()
+            if prof:
+                prof.mark('ship')
+            self._update_bullets()
+            if prof:
+                prof.mark('bullets')
+            self._update_aliens()
+            if prof:
+                prof.mark('aliens')
    
     # helper method
     # Watch for keyboard and mouse events.
     def _check_events(self):
         """Respond to key presses and mouse events."""
+        # Only the event types in the dispatch table are let into the
+        # queue (see __init__), so everything we drain here is one we use.
         for event in pygame.event.get():
+            self._handle_event(event)
 
-            # when the player clicks the game window’s close button
-            if event.type == pygame.QUIT:
-
-                # and we call sys.exit() to exit the game
-                sys.exit()
-
-            # Pygame detects a MOUSEBUTTONDOWN event when the player clicks anywhere on the screen  
-            # but we want to restrict our game to respond to mouse clicks only on the Play button.
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-
-                #  To accomplish this, we use pygame.mouse.get_pos(), which returns a tuple containing 
-                #  the mouse cursor’s x- and y-coordinates when the mouse button is clicked.
-                mouse_pos = pygame.mouse.get_pos()
+    # helper method
+    def _handle_event(self, event):
+        """Respond to a single key press or mouse event."""
+        handler = self._event_handlers.get(event.type)
+        if handler:
+            handler(event)
+
+    def perform_action(self, action, pressed=True):
+        """Carry out an action, pressed or released, whatever asked for it."""
+        # Keys, recordings and scripts all come through here, so the
+        # recorder sees every action no matter where it came from.
+        if self.recorder:
+            self.recorder.record_action(self.ticks, action, pressed)
+        self._action_handlers[action](pressed)
+
+    def close(self):
+        """Write out anything the game still holds before it exits."""
+        if self.profiler:
+            if self.settings.profile_trace:
+                self.profiler.dump(self.settings.profile_trace)
+            self.profiler.detach()
+        if self.recorder:
+            self.recorder.finish(self.ticks, self.stats)
+        if self.scores:
+            # Quitting in the middle of a game ends it, so it's saved just
+            # like a game that ran out of ships.
+            if self.stats.game_active and self.stats.score > 0:
+                self.scores.record_game(self.stats.score, self.stats.level)
+                self.stats.game_active = False
+            self.scores.close()
 
-                # We send these values to the new method _check_play_button() w.
-                self._check_play_button(mouse_pos)
-            
-    
-            # respond when Pygame detects a KEYDOWN event
-            elif event.type == pygame.KEYDOWN:
-                self._check_keydown_events(event)
-               
-            # we add a new elif block, which responds to KEYUP events. 
-            elif event.type == pygame.KEYUP:
-                self._check_keyup_events(event)
+    # helper method
+    def _quit_game(self):
+        """Close the game down and exit."""
+        self.close()
+        sys.exit()
 
     # helper method
     def _check_play_button(self, mouse_pos):
@@ -110,90 +395,114 @@ class AlienInvasion:
 
         # the game will restart only if Play is clicked and the game is not currently active.
         if button_clicked and not self.stats.game_active:
+            self._start_game()
 
-            # Reset the game settings.
-            self.settings.initialize_dynamic_settings()
-
-            # Reset the game statistics.
-            # we reset the game statistics, which gives the player three new ships.
-            self.stats.reset_stats()
-
-            # If so, we set game_active to True, and the game begins!
-            # Then we set game_active to True so the game will begin as soon as 
-            # the code in this function finishes running.
-            self.stats.game_active =True 
-
-            # We call prep_score() after resetting the game stats when starting a new game.
-            #  This preps the scoreboard with a 0 score.
-            self.sb.prep_score()
-            self.sb.prep_level()
-            self.sb.prep_ships()
-            # Get rid of any remaining aliens and bullets.
-            # We empty the aliens and bullets groups
-            self.aliens.empty()
-            self.bullets.empty()
-
-            # Create a new fleet and center the ship.
-            # then create a new fleet and center the ship. 
-            self._create_fleet()
-            self.ship.center_ship()
+    # helper method
+    def _start_game(self):
+        """Reset the game and start a new round."""
+        self.pause_ticks = 0
+
+        # Reset the game settings.
+        self.settings.initialize_dynamic_settings()
+
+        # Reset the game statistics.
+        # we reset the game statistics, which gives the player three new ships.
+        self.stats.reset_stats()
+
+        # If so, we set game_active to True, and the game begins!
+        # Then we set game_active to True so the game will begin as soon as 
+        # the code in this function finishes running.
+        self.stats.game_active =True 
+
+        # We call prep_score() after resetting the game stats when starting a new game.
+        #  This preps the scoreboard with a 0 score.
+        self.sb.prep_score()
+        self.sb.prep_level()
+        self.sb.prep_ships()
+        # Get rid of any remaining aliens and bullets.
+        # We empty the aliens and bullets groups
+        self.aliens.empty()
+        self.bullets.empty()
+
+        # Create a new fleet and center the ship.
+        # then create a new fleet and center the ship. 
+        self._create_fleet()
+        self.ship.center_ship()
 
-            # Hide the mouse cursor.
-            # Passing False to set_visible() tells Pygame to hide the cursor 
-            # when the mouse is over the game window.
-            pygame.mouse.set_visible(False)
+        # Hide the mouse cursor.
+        # Passing False to set_visible() tells Pygame to hide the cursor 
+        # when the mouse is over the game window.
+        pygame.mouse.set_visible(False)
 
     # helper method
     def _check_keydown_events(self, event):
         """Respond to keypresses."""
+        # The keymap says which action, if any, this key is bound to.
+        action = self.keymap.action_for(event.key)
+        if action:
+            self.perform_action(action, True)
 
-        # We check whether the key pressed, event.key, is the right arrow key
-        # The right arrow key is represented by pygame.K_RIGHT
-        if event.key == pygame.K_RIGHT:
+    # helper method
+    def _check_keyup_events(self, event):
+        """Respond to key releases."""
+        action = self.keymap.action_for(event.key)
+        if action:
+            self.perform_action(action, False)
 
-            # we modify how the game responds when the player presses the right arrow key
-            # instead of changing the ship’s position directly, we merely set moving_right to True
-            self.ship.moving_right = True
+    # helper method
+    def _check_mouse_events(self, event):
+        """Respond to a mouse click."""
+        if self.recorder:
+            self.recorder.record_click(self.ticks, event.pos)
+
+        # Pygame detects a MOUSEBUTTONDOWN event when the player clicks anywhere on the screen  
+        # but we want to restrict our game to respond to mouse clicks only on the Play button.
+        #  To accomplish this, we use the event's pos attribute, a tuple containing 
+        #  the mouse cursor’s x- and y-coordinates when the mouse button was clicked.
+        #  Unlike pygame.mouse.get_pos(), it is still right when a replay hands us the event.
+        self._check_play_button(event.pos)
 
-        # We check whether the key pressed, event.key, is the left arrow key
-        # The right arrow key is represented by pygame.K_LEFT
-        elif event.key == pygame.K_LEFT:
+    # helper method
+    def _check_expose_events(self, event):
+        """Repaint everything when the window has been uncovered."""
+        if self.renderer:
+            self.renderer.invalidate()
 
-            # we modify how the game responds when the player presses the left arrow key
-            # instead of changing the ship’s position directly, we merely set moving_left to True
-            self.ship.moving_left = True   
-         
-        # ends the game when the player presses Q
-        elif event.key ==  pygame.K_q:
-            sys.exit()
+    # helper method
+    def _move_left(self, pressed):
+        """Start or stop moving the ship left."""
+        # instead of changing the ship’s position directly, we merely set moving_left
+        self.ship.moving_left = pressed
 
-        # we call _fire_bullet() when the spacebar is pressed
-        elif event.key == pygame.K_SPACE:
+    # helper method
+    def _move_right(self, pressed):
+        """Start or stop moving the ship right."""
+        # instead of changing the ship’s position directly, we merely set moving_right
+        self.ship.moving_right = pressed
+
+    # helper method
+    def _fire(self, pressed):
+        """Fire when the fire key goes down."""
+        if pressed:
             self._fire_bullet()
-        
+
     # helper method
-    def _check_keyup_events(self, event):
-        """Respond to key releases."""
-        # When the player releases the right arrow key (K_RIGHT),
-        # we set moving_right to False.
-        if event.key == pygame.K_RIGHT:
-            self.ship.moving_right=False
-                    
-        # When the player releases the left arrow key (K_LEFT),
-        # we set moving_LEFT to False.
-        elif event.key == pygame.K_LEFT:
-            self.ship.moving_left=False
-    
+    def _quit(self, pressed):
+        """End the game when the quit key goes down."""
+        if pressed:
+            self._quit_game()
+
+    # helper method
+    def _play(self, pressed):
+        """Start a new game, as clicking Play does."""
+        if pressed and not self.stats.game_active:
+            self._start_game()
 
     def _fire_bullet(self):
-        """Create a new bullet and add it to the bullets group."""
-        if len(self.bullets) < self.settings.bullets_allowed:
-            # we make an instance of Bullet and call it new_bullet
-            new_bullet = Bullet(self)
-            # We then add it to the group bullets using the add() method x.
-            # The add() method is similar to append(), but it’s a method 
-            # that’s written specifically for Pygame groups.
-            self.bullets.add(new_bullet)
+        """Fire a bullet from the pool if the limit allows."""
+        # The pool checks bullets_allowed and reuses a spent bullet rather
+        # than making a new one.
+        self.bullets.fire()
 
 
     # helper method
@@ -203,32 +512,72 @@ class AlienInvasion:
 
         # Redraw the screen during each pass through the loop.
         # we use self.settings to access the background color when filling the screen
-        self.screen.fill(self.settings.bg_color)
+        # The dirty-rect renderer only clears what moved since last frame;
+        # the overlay isn't tracked, so it needs a full repaint.
+        renderer = self.renderer
+        if renderer:
+            if self.profiler and self.settings.profile_overlay:
+                renderer.invalidate()
+            renderer.begin(self._scene())
+        else:
+            self.screen.fill(self.settings.bg_color)
+
+        # Clearing is timed as screen and drawing the sprites on their own.
+        prof = self.profiler
+        if prof:
+            prof.mark('screen')
 
         # we draw the ship on the screen by calling ship.blitme(), so the ship appears on top of the background
         self.ship.blitme()
         
-        # The bullets.sprites() method returns a list of all sprites in the group bullets. 
-        # To draw all fired bullets to the screen, we loop through the sprites in bullets 
-        # and call draw_bullet() on each one
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
-
-        self.aliens.draw(self.screen)
+        # The bullet pool draws all fired bullets to the screen in one batch,
+        # blitting its pre-filled bullet surface at each bullet's rect.
+        self.bullets.draw(self.screen)
+
+        # The aliens go in one batch too. Unlike Group.draw(), this skips
+        # recording each sprite's drawn rect, which nothing here uses. The
+        # vector fleet draws from its arrays, without writing any rects.
+        if self.vector_fleet:
+            self.aliens.draw(self.screen)
+        else:
+            self.screen.blits([(alien.image, alien.rect)
+                for alien in self.aliens], doreturn=False)
+
+        if prof:
+            prof.mark('sprites')
 
         # Draw the score information.
+        # The HUD carries the play button too while the game is inactive, so
+        # the button stays above all other elements on the screen.
         self.sb.show_score()
+        if prof:
+            prof.mark('score')
 
-        # Draw the play button if the game is inactive.
-        # To make the Play button visible above all other elements on the screen, 
-        # we draw it after all the other elements have been drawn but before flipping to a new screen.
-        # We include it in an if block, so the button only appears when the game is inactive.
-        if not self.stats.game_active:
-            self.play_button.draw_button()
+        if prof and self.settings.profile_overlay:
+            prof.draw_overlay(self.screen)
 
         # Make the most recently drawn screen visible.
-        pygame.display.flip()
+        # A headless game has nothing to flip; its frames stay off-screen.
+        if renderer:
+            renderer.present()
+        elif not self.headless:
+            pygame.display.flip()
+        if prof:
+            prof.mark('screen')
 
+    # helper method
+    def _scene(self):
+        """Return (content, rect) pairs for everything drawn this frame."""
+        # The renderer compares these with last frame's to find what moved.
+        # Rects are turned into tuples because a rect can't be hashed. The
+        # vector fleet only writes its rects when something reads them.
+        if self.vector_fleet:
+            self.aliens.sync_rects()
+        items = [(self.ship.image, tuple(self.ship.rect))]
+        items += [(bullet.color, tuple(bullet.rect)) for bullet in self.bullets]
+        items += [(alien.image, tuple(alien.rect)) for alien in self.aliens]
+        items += self.sb.scene()
+        return items
 
     # helper method
     def _update_bullets(self):
@@ -238,17 +587,15 @@ class AlienInvasion:
         # for each bullet we place in the group bullets.
         self.bullets.update()
 
-        # Get rid of bullets that have disappeared.
-        # We use the copy() method to set up the for loop ,
-        # which enables us to modify bullets inside the loop.
-        for bullet in self.bullets.copy():
-            # We check each bullet to see whether 
-            # it has disappeared off the top of the screen 
-            if bullet.rect.bottom <= 0:
-                # If it has, we remove it from bullets 
-                self.bullets.remove(bullet)
+        # A swept bullet can hit an alien on its way off the top of the
+        # screen, so collisions are checked before spent bullets go.
         self._check_bullet_alien_collisions()
 
+        # Get rid of bullets that have disappeared.
+        # Bullets that have gone off the top of the screen go back to the
+        # pool; this is done in place, without copying the list.
+        self.bullets.cull()
+
     # helper method
     # look for collisions between bullets and aliens, and to respond appropriately
     # if the entire fleet has been destroyed
@@ -261,7 +608,18 @@ class AlienInvasion:
         # To make a high-powered bullet that can travel to the top of the screen, destroying every alien in its path,
         # you could set the first Boolean argument to False and keep the second Boolean argument set to True. 
         # The aliens hit would disappear, but all bullets would stay active until they disappeared off the top of the screen.
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
+        # The spatial hash returns the same {bullet: [aliens]} dictionary as
+        # groupcollide(); setting collision_broadphase to False falls back to
+        # testing every bullet against every alien. Swept tests follow each
+        # bullet's path through the grid, so they always use the hash.
+        swept = self.settings.collision_mode == 'swept'
+        if self.settings.collision_broadphase or swept:
+            collisions = self.broadphase.groupcollide(self.bullets, self.aliens,
+                True, True, swept)
+        else:
+            if self.vector_fleet:
+                self.aliens.sync_rects()
+            collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
 
         # When a bullet hits an alien, Pygame returns a collisions dictionary. 
         # We check whether the dictionary exists, and if it does, the alien’s value is 
@@ -272,6 +630,8 @@ class AlienInvasion:
                 # Remember that each value is a list of aliens hit by a single bullet. 
                 # We multiply the value of each alien by the number of aliens in each list and add this amount to the current score.
                 self.stats.score += self.settings.alien_points * len(aliens)
+                for alien in aliens:
+                    self.fleet_bounds.remove(alien)
             self.sb.prep_score()
             # We call check_high_score() when the collisions dictionary is present, and 
             # we do so after updating the score for all the aliens that have been hit.
@@ -286,76 +646,78 @@ class AlienInvasion:
             # If it is, we get rid of any existing bullets by using the empty() method,
             # which removes all the remaining sprites from a group
             self.bullets.empty()
+            #Increase level.
+            # The level goes up first, since it picks the new fleet's formation.
+            self.stats.level += 1
             # We also call _create_fleet(), which fills the screen with aliens again.
             self._create_fleet() 
             # Changing the values of the speed settings ship_speed, alien_speed, 
             # and bullet_speed is enough to speed up the entire game! 
             self.settings.increase_speed()
-            #Increase level.
-            self.stats.level += 1
             self.sb.prep_level()
     # helper method
     def _create_fleet(self):
         """Create the fleet of aliens."""
+        self._fleet_pending = False
+
+        # Where every alien goes depends only on the screen, alien and ship
+        # sizes, so the layout is worked out once and cached. The alien's
+        # size comes from its shared image; no probe alien is needed.
+        alien_width, alien_height = self.assets.load_image('images/alien.bmp').get_size()
+        sizes = (self.settings.screen_width, self.settings.screen_height,
+            alien_width, alien_height, self.ship.rect.height)
+        if self.settings.formations:
+            # The level script picks this level's formation, which is
+            # compiled to a layout and motion arrays the first time it's used.
+            from formations import compile_formation, formation_for_level
+            spec = formation_for_level(self.settings.formations, self.stats.level)
+            layout, motion = compile_formation(spec, *sizes)
+        else:
+            layout, motion = fleet_layout(*sizes), None
+
+        # The aliens themselves are made once per layout and reused for
+        # every new fleet after that. Layouts are cached, so the same
+        # layout is always the same tuple, and its id() is a key that
+        # doesn't need the whole tuple hashed on every respawn. The pool
+        # keeps its layout alive, so the id can't be handed to another.
+        pool = self._alien_pools.get(id(layout))
+        if pool is None:
+            pool = (layout, [Alien(self) for _ in layout])
+            self._alien_pools[id(layout)] = pool
+        aliens = pool[1]
+
+        # The vector fleet copies the layout into its arrays in one go.
+        if self.vector_fleet:
+            self.aliens.populate(aliens, layout, motion)
+        else:
+            # Only the vector fleet can move aliens within the block, so
+            # here every formation moves as one.
+            motion = None
+
+            # Put every pooled alien back at its starting place in the grid.
+            for alien, (x, y) in zip(aliens, layout):
+                alien.x = float(x)
+                alien.rect.x = x
+                alien.rect.y = y
+            self.aliens.add(aliens)
+
+        # The collision grid describes the old fleet, so rebuild it lazily.
+        # A moving formation doesn't keep its shape, so the grid widens its
+        # search by as far as any alien can move. The vector fleet's bounds
+        # are read from its arrays.
+        self.broadphase.invalidate(motion.reach if motion else (0, 0))
+        self.fleet_bounds.reset(aliens, layout,
+            self.aliens if self.vector_fleet else None)
 
-        # Create an alien and find the number of aliens in a row.
-        # Spacing between each alien is equal to one alien width.
-        # We need to know the alien’s width and height to place aliens, so we create an alien
-        # before we perform calculations. This alien won’t be part of the fleet, so don’t add it to the group aliens.
-        alien = Alien(self)
-
-        # we use the attribute size, which contains a tuple with the width and height of a rect object.
-        alien_width, alien_height = alien.rect.size
-
-        # we get the alien’s width from its rect attribute and store this value in alien_width so
-        # we don’t have to keep working through the rect attribute.
-        alien_width = alien.rect.width
-
-        # we calculate the horizontal space available for aliens and 
-        # the number of aliens that can fit into that space.
-        available_space_x = self.settings.screen_width - (2 * alien_width)
-        number_aliens_x = available_space_x // (2 * alien_width)
-
-
-        # Determine the number of rows of aliens that fit on the screen.
-        # To calculate the number of rows we can fit on the screen, we write our available_space_y 
-        # calculation right after the calculation for available_space_x
-        ship_height = self.ship.rect.height
-        available_space_y = (self.settings.screen_height - (3 * alien_height) - ship_height)
-        number_rows = available_space_y // (2 * alien_height)
-
-
-        # Create the full fleet of aliens.
-        # To create multiple rows, we use two nested loops: one outer and one inner loop
-        for row_number in range(number_rows):
-            # Create the first row of aliens.
-            # we set up a loop that counts from 0 to the number of aliens we need to make
-            for alien_number in range(number_aliens_x):
-                # Create an alien and place it in the row.
-                self._create_alien(alien_number,row_number)
-            
-
-    # helper method 
-    def _create_alien(self, alien_number, row_number):
-        """Create an alien and place it in the row."""
-        alien = Alien(self)
-
-        # i don't use this varable alien_height in this function and this is weird (mohamed rabie says that)
-        alien_width, alien_height = alien.rect.size
-        alien.x = alien_width + 2 * alien_width * alien_number
-
-        # In the main body of the loop, we create a new alien and then 
-        # set its x-coordinate value to place it in the row
-        alien.rect.x = alien.x 
-
-        # we change an alien’s y-coordinate value when it’s not in the first row x 
-        # by starting with one alien’s height to create empty space at the top of the screen
-        alien.rect.y = alien.rect.height + 2 * alien.rect.height * row_number
-        self.aliens.add(alien)
-    
     # helper method
     def _change_fleet_direction(self):
         """Drop the entire fleet and change the fleet's direction."""
+        if self.vector_fleet:
+            # The vector fleet drops every alien in a single array operation.
+            self.aliens.drop()
+            self.settings.fleet_direction *= -1
+            return
+
         for alien in self.aliens.sprites():
             # In _change_fleet_direction(), we loop through all the aliens and
             # drop each one using the setting fleet_drop_speed
@@ -367,14 +729,12 @@ class AlienInvasion:
     # helper method
     def _check_fleet_edges(self):
         """Respond appropriately if any aliens have reached an edge."""
-        
-        # we loop through the fleet and call check_edges() on each alien
-        for alien in self.aliens.sprites():
-            # If check_edges() returns True, we know an alien is at an edge and the whole fleet needs to change direction; 
-            # so we call _change_fleet_direction() and break out of the loop
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        # Rather than looping through the fleet checking every alien's rect
+        # against the screen, we ask the fleet's bounds, which only look at the outermost
+        # live columns. If either is at an edge, the whole fleet needs to
+        # change direction, so we call _change_fleet_direction().
+        if self.fleet_bounds.at_edge():
+            self._change_fleet_direction()
         
 
     
@@ -402,10 +762,17 @@ class AlienInvasion:
             # Then we add a pause after the updates have been made to all the game elements but 
             # before any changes have been drawn to the screen,
             #  so the player can see that their ship has been hit
-            sleep(0.5)
+            # The pause is counted in ticks, so the loop keeps running and a
+            # headless run passes through it without any real waiting.
+            self.pause_ticks = round(self.settings.ship_hit_pause / self.settings.time_step)
         else :
             self.stats.game_active = False
 
+            # The store writes the result on its own thread, so saving
+            # doesn't hold up the game.
+            if self.scores:
+                self.scores.record_game(self.stats.score, self.stats.level)
+
             # We make the cursor visible again as soon as the game becomes inactive,
             # which happens in _ship_hit().
             pygame.mouse.set_visible(True)
@@ -414,17 +781,13 @@ class AlienInvasion:
     # The method _check_aliens_bottom() checks whether any aliens have reached the bottom of the screen
     def _check_aliens_bottom(self):
         """Check if any aliens have reached the bottom of the screen."""
-        screen_rect = self.screen.get_rect()
-        for alien in self.aliens.sprites():
-            # An alien reaches the bottom when its rect.bottom value is
-            # greater than or equal to the screen’s rect.bottom attribute
-            if alien.rect.bottom >= screen_rect.bottom:
-                # Treat this the same as if the ship got hit.
-                # If an alien reaches the bottom, we call _ship_hit(). 
-                # If one alien hits the bottom
-                self._ship_hit()
-                # there’s no need to check the rest, so we break out of the loop after calling _ship_hit().
-                break
+        # An alien reaches the bottom when its rect.bottom value is
+        # greater than or equal to the screen’s rect.bottom attribute.
+        # Only the lowest live row can get there first, so the fleet's
+        # bounds check just that row.
+        if self.fleet_bounds.at_bottom():
+            # Treat this the same as if the ship got hit.
+            self._ship_hit()
 
 
     # helper method
@@ -441,7 +804,13 @@ class AlienInvasion:
         
         # Look for alien-ships collisions.
         # If no collisions occur, spritecollideany() returns None and the if block at won’t execute.
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        # The vector fleet tests every alien against the ship in one array
+        # operation instead.
+        if self.vector_fleet:
+            ship_hit = self.aliens.overlaps(self.ship.rect)
+        else:
+            ship_hit = pygame.sprite.spritecollideany(self.ship, self.aliens)
+        if ship_hit:
 
             # If it finds an alien that has collided with the ship, it returns that alien and 
             # the if block executes: it prints Ship hit!!!
@@ -452,7 +821,97 @@ class AlienInvasion:
         # all the aliens and after looking for alien and ship collisions
         self._check_aliens_bottom()
 
-if __name__ == '__main__':
+def main(argv=None):
+    """Parse the command line and run the game."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Play Alien Invasion.")
+    parser.add_argument('--headless', action='store_true',
+        help="run the simulation without a display, as fast as possible")
+    parser.add_argument('--frames', type=int, default=3600,
+        help="number of ticks to simulate in headless mode")
+    parser.add_argument('--profile', action='store_true',
+        help="record per-phase frame timings")
+    parser.add_argument('--overlay', action='store_true',
+        help="draw the profiler's FPS and frame-time overlay")
+    parser.add_argument('--trace', metavar='PATH',
+        help="write frame timings to a .csv or .json file on exit")
+    parser.add_argument('--record', metavar='PATH',
+        help="record this session's input so it can be replayed")
+    parser.add_argument('--seed', type=int,
+        help="seed for the random number generator (stored in recordings)")
+    parser.add_argument('--replay', metavar='PATH',
+        help="replay a recording headless and check its final stats")
+    parser.add_argument('--settings', metavar='PATH',
+        help="load a settings profile from a .toml or .json file, and "
+            "reload it whenever it changes")
+    parser.add_argument('--no-scores', action='store_true',
+        help="don't load or save high scores")
+    parser.add_argument('--startup-trace', action='store_true',
+        help="start the game in a fresh interpreter and report how long it "
+            "takes to reach the first frame, and which imports cost the most")
+    # Used by --startup-trace and benchmark.py: build the game, report when
+    # its first frame was on screen, and exit.
+    parser.add_argument('--first-frame', action='store_true',
+        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.startup_trace:
+        import startup_trace
+        if argv is None:
+            argv = sys.argv[1:]
+        startup_trace.main([arg for arg in argv if arg != '--startup-trace'])
+        return
+
+    if args.replay:
+        from replay import replay
+        result = replay(args.replay)
+        print(f"expected={result.expected} actual={result.actual} "
+            f"{'match' if result.matched else 'MISMATCH'}")
+        sys.exit(0 if result.matched else 1)
+
+    # Seed the random number generator so a recording can reproduce it.
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    random.seed(seed)
+
+    profile = None
+    if args.settings:
+        from profiles import load_profile
+        profile = load_profile(args.settings)
+    settings = Settings(profile)
+    settings.profile = args.profile or args.overlay or bool(args.trace)
+    settings.profile_overlay = args.overlay
+    settings.profile_trace = args.trace
+    if args.no_scores:
+        settings.score_store = None
+
+    if args.first_frame:
+        # Building a windowed game draws the loading screen straight away.
+        import json
+        import time
+        ai = AlienInvasion(settings=settings)
+        flipped_at = time.time()
+        ai.close()
+        print(json.dumps({'flipped_at': flipped_at,
+            'first_frame': ai.startup['first_frame']}))
+        return
+
     # Make a game instance, and run the game.
-    ai = AlienInvasion()
-    ai.run_game()
\ No newline at end of file
+    ai = AlienInvasion(headless=args.headless, settings=settings)
+    if args.record:
+        from replay import InputRecorder
+        ai.recorder = InputRecorder(args.record, ai.settings, seed)
+    elif args.settings:
+        # A recording only keeps the profile the game started with, so the
+        # file isn't watched while recording.
+        from profiles import ProfileWatcher
+        ai.watcher = ProfileWatcher(args.settings)
+    if args.headless:
+        stats = ai.run_frames(args.frames)
+        ai.close()
+        print(f"score={stats.score} level={stats.level} "
+            f"ships_left={stats.ships_left}")
+    else:
+        ai.run_game()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
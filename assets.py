@@ -0,0 +1,119 @@
+import threading
+
+import pygame
+
+class AssetCache:
+    """A class to load each image and font once and share it."""
+
+    def __init__(self, target=None):
+        """Initialize an empty cache for images drawn onto target."""
+        # Images are converted to the pixel format of the surface they'll
+        # be drawn on: the given target, or else the display.
+        self.target = target
+
+        # Surfaces are keyed by (path, alpha) so the same file can be
+        # handed out both with and without per-pixel alpha.
+        self._images = {}
+
+        # The counters let us see how often the disk is actually touched.
+        self.hits = 0
+        self.misses = 0
+
+        # Fonts are keyed by (name, size, bold, italic).
+        self._fonts = {}
+
+        # Images decoded by preload() but not yet handed out. preloaded is
+        # set once the background thread has finished, whether or not it
+        # succeeded; anything it raised is kept to be raised again by
+        # wait_for_preload() on the main thread.
+        self._decoded = {}
+        self.preloaded = threading.Event()
+        self.preloaded.set()
+        self.progress = 1.0
+        self._preload_error = None
+
+    def preload(self, images):
+        """Decode images on a background thread."""
+        # Only the slow part happens off the main thread: reading and
+        # decoding files. Converting surfaces is left for load_image().
+        self.preloaded.clear()
+        self.progress = 0.0
+        self._preload_error = None
+        thread = threading.Thread(target=self._preload, args=(images,),
+            daemon=True)
+        thread.start()
+
+    def _preload(self, images):
+        """Do the work of preload()."""
+        try:
+            for done, path in enumerate(images, 1):
+                self._decoded[path] = pygame.image.load(path)
+                self.progress = done / len(images)
+        except Exception as error:
+            self._preload_error = error
+        finally:
+            # Whatever happened, nobody must be left waiting.
+            self.preloaded.set()
+
+    def wait_for_preload(self):
+        """Wait for preload() to finish, raising anything it raised."""
+        self.preloaded.wait()
+        if self._preload_error is not None:
+            raise self._preload_error
+
+    def load_image(self, path, alpha=False):
+        """Return the shared surface for path, loading it on first use."""
+        key = (path, alpha)
+        image = self._images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = self._decoded.pop(path, None)
+        if image is None:
+            image = pygame.image.load(path)
+
+        # Converting to the target's pixel format means every later blit
+        # can copy pixels directly. Per-pixel alpha can only be converted
+        # for the display, so until a display mode has been set those
+        # images are cached raw.
+        display = pygame.display.get_surface()
+        if alpha:
+            if display is not None:
+                image = image.convert_alpha()
+        elif self.target is not None:
+            image = image.convert(self.target)
+        elif display is not None:
+            image = image.convert()
+
+        self._images[key] = image
+        return image
+
+    def load_font(self, name, size, bold=False, italic=False):
+        """Return a shared font, as pygame.font.SysFont() would make it."""
+        key = (name, size, bold, italic)
+        font = self._fonts.get(key)
+        if font is None:
+            # The default font ships with pygame, so it's opened directly
+            # rather than through SysFont(), which scans the system's fonts
+            # the first time it's called. Like SysFont, pygame makes it
+            # bold or italic when asked.
+            if name is None:
+                font = pygame.font.Font(None, size)
+                font.set_bold(bold)
+                font.set_italic(italic)
+            else:
+                font = pygame.font.SysFont(name, size, bold, italic)
+            self._fonts[key] = font
+        return font
+
+    def invalidate(self):
+        """Drop every cached surface, e.g. after the display mode changes.
+
+        Sprites keep the surfaces they were given, so callers must rebuild
+        them (or fetch their images again) afterwards.
+        """
+        # Surfaces converted for the old display format are no longer a
+        # match, so the next request for each image reloads and reconverts it.
+        self._images.clear()
@@ -0,0 +1,265 @@
+import numpy as np
+import pygame
+
+from settings import Settings
+
+# Each action is a bit mask: hold left, hold right, and/or fire this tick.
+LEFT = 1
+RIGHT = 2
+FIRE = 4
+
+class BatchAlienInvasion:
+    """A class to step many games at once, each held as rows of NumPy arrays."""
+
+    def __init__(self, num_envs, settings=None, alien_size=None, ship_size=None):
+        """Set up num_envs games, all sharing one set of settings."""
+        if settings is None:
+            settings = Settings()
+        self.settings = settings
+        self.num_envs = num_envs
+
+        # The sprites' sizes come from their images unless we're told them.
+        if alien_size is None:
+            alien_size = pygame.image.load('images/alien.bmp').get_size()
+        if ship_size is None:
+            ship_size = pygame.image.load('images/ship.bmp').get_size()
+        self.alien_width, self.alien_height = alien_size
+        self.ship_width, self.ship_height = ship_size
+        self.screen_width = settings.screen_width
+        self.screen_height = settings.screen_height
+
+        # The fleet is laid out exactly as _create_fleet() does it. Every
+        # game uses the same grid; what differs is which aliens are alive
+        # and how far the whole block has moved.
+        aw, ah = alien_size
+        cols = (self.screen_width - 2 * aw) // (2 * aw)
+        rows = (self.screen_height - 3 * ah - self.ship_height) // (2 * ah)
+        self.home_x = aw + 2.0 * aw * np.arange(cols)
+        self.home_y = ah + 2 * ah * np.arange(rows)
+        self.rows, self.cols = rows, cols
+
+        # The ship starts centred at the bottom, as center_ship() puts it.
+        self.ship_home = float(self.screen_width // 2 - self.ship_width // 2)
+        self.ship_y = self.screen_height - self.ship_height
+
+        self.bullet_width = settings.bullet_width
+        self.bullet_height = settings.bullet_hight
+        self.max_bullets = settings.bullets_allowed
+        self.pause_length = round(settings.ship_hit_pause / settings.time_step)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """Start new games in every environment, or just those in mask."""
+        n = self.num_envs
+        if mask is None:
+            mask = np.ones(n, dtype=bool)
+        if not hasattr(self, 'score'):
+            self._allocate()
+
+        # Matches initialize_dynamic_settings() and reset_stats().
+        profile = self.settings.active_profile
+        self.ship_speed[mask] = profile.ship_speed
+        self.bullet_speed[mask] = profile.bullet_speed
+        self.alien_speed[mask] = profile.alien_speed
+        self.alien_points[mask] = profile.alien_points
+        self.fleet_direction[mask] = 1
+        self.score[mask] = 0
+        self.level[mask] = 1
+        self.ships_left[mask] = self.settings.ship_limit
+        self.active[mask] = True
+        self.pause_ticks[mask] = 0
+
+        self._new_fleet(mask)
+        self._clear_bullets(mask)
+        self.ship_x[mask] = self.ship_home
+
+    def _allocate(self):
+        """Create the state arrays."""
+        n, b = self.num_envs, self.max_bullets
+        self.ship_speed = np.zeros(n)
+        self.bullet_speed = np.zeros(n)
+        self.alien_speed = np.zeros(n)
+        self.alien_points = np.zeros(n, dtype=np.int64)
+        self.fleet_direction = np.ones(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.high_score = np.zeros(n, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.ships_left = np.zeros(n, dtype=np.int64)
+        self.active = np.zeros(n, dtype=bool)
+        self.pause_ticks = np.zeros(n, dtype=np.int64)
+
+        self.ship_x = np.zeros(n)
+
+        # Bullets are slots; fired_at orders them the way the bullet pool
+        # keeps them, oldest first, so collisions resolve in the same order.
+        self.bullet_x = np.zeros((n, b), dtype=np.int64)
+        self.bullet_y = np.zeros((n, b))
+        self.bullet_active = np.zeros((n, b), dtype=bool)
+        self.bullet_fired_at = np.zeros((n, b), dtype=np.int64)
+        self._shots = 0
+
+        self.alive = np.zeros((n, self.rows, self.cols), dtype=bool)
+        self.fleet_dx = np.zeros(n)
+        self.fleet_dy = np.zeros(n, dtype=np.int64)
+
+    def _new_fleet(self, mask):
+        """Give the masked games a full fleet at its starting position."""
+        self.alive[mask] = True
+        self.fleet_dx[mask] = 0.0
+        self.fleet_dy[mask] = 0
+
+    def _clear_bullets(self, mask):
+        """Remove every bullet in the masked games."""
+        self.bullet_active[mask] = False
+
+    def step(self, actions):
+        """Advance every game by one tick and return (rewards, dones)."""
+        actions = np.asarray(actions)
+        start_score = self.score.copy()
+
+        # Firing is input, so like a key press it happens even during the
+        # pause after a hit; games that are over ignore it.
+        self._fire(self.active & ((actions & FIRE) != 0))
+
+        # Paused games only count down; the rest run a full tick.
+        paused = self.pause_ticks > 0
+        self.pause_ticks[paused] -= 1
+        running = self.active & ~paused
+
+        self._update_ship(running, actions)
+        self._update_bullets(running)
+        self._update_aliens(running)
+
+        return self.score - start_score, ~self.active
+
+    def _fire(self, mask):
+        """Fire a bullet in each masked game that has a free slot."""
+        free = ~self.bullet_active
+        can_fire = mask & free.any(axis=1)
+        if not can_fire.any():
+            return
+        envs = np.nonzero(can_fire)[0]
+        slots = free[envs].argmax(axis=1)
+
+        # A bullet's midtop starts at the ship's midtop.
+        ship_rect_x = _round(self.ship_x[envs])
+        centerx = ship_rect_x + self.ship_width // 2
+        self.bullet_x[envs, slots] = centerx - self.bullet_width // 2
+        self.bullet_y[envs, slots] = self.ship_y
+        self.bullet_active[envs, slots] = True
+        self._shots += 1
+        self.bullet_fired_at[envs, slots] = self._shots
+
+    def _update_ship(self, mask, actions):
+        """Move the ships the same way Ship.update() does."""
+        rect_x = _round(self.ship_x)
+        step = self.ship_speed * self.settings.time_step
+        right = mask & ((actions & RIGHT) != 0) & (rect_x + self.ship_width < self.screen_width)
+        left = mask & ((actions & LEFT) != 0) & (rect_x > 0)
+        self.ship_x += np.where(right, step, 0.0) - np.where(left, step, 0.0)
+
+    def _alien_rects(self):
+        """Return every game's alien column x and row y positions."""
+        x = _round(self.home_x[None, :] + self.fleet_dx[:, None])
+        y = self.home_y[None, :] + self.fleet_dy[:, None]
+        return x, y
+
+    def _update_bullets(self, mask):
+        """Move bullets, drop spent ones, and resolve hits on the fleet."""
+        step = self.bullet_speed * self.settings.time_step
+        moving = self.bullet_active & mask[:, None]
+        self.bullet_y -= np.where(moving, step[:, None], 0.0)
+
+        # Bullets whose bottom has left the top of the screen are gone.
+        rect_y = _round(self.bullet_y)
+        self.bullet_active &= ~(moving & (rect_y + self.bullet_height <= 0))
+
+        # Bullets are checked oldest first, as groupcollide() checks them,
+        # so an alien hit by one bullet can't also be hit by the next.
+        alien_x, alien_y = self._alien_rects()
+        order = np.argsort(np.where(self.bullet_active,
+            self.bullet_fired_at, np.iinfo(np.int64).max), axis=1)
+        envs = np.arange(self.num_envs)
+        for k in range(self.max_bullets):
+            slot = order[:, k]
+            live = mask & self.bullet_active[envs, slot]
+            if not live.any():
+                break
+            bx = self.bullet_x[envs, slot]
+            by = rect_y[envs, slot]
+            overlap_x = ((bx[:, None] < alien_x + self.alien_width)
+                & (bx[:, None] + self.bullet_width > alien_x))
+            overlap_y = ((by[:, None] < alien_y + self.alien_height)
+                & (by[:, None] + self.bullet_height > alien_y))
+            hits = (self.alive & overlap_y[:, :, None] & overlap_x[:, None, :]
+                & live[:, None, None])
+            count = hits.sum(axis=(1, 2))
+            self.alive &= ~hits
+            self.score += self.alien_points * count
+            self.bullet_active[envs, slot] &= count == 0
+
+        self.high_score = np.maximum(self.high_score, self.score)
+
+        # A cleared fleet means a new fleet and the next, faster level.
+        cleared = mask & ~self.alive.any(axis=(1, 2))
+        if cleared.any():
+            self._clear_bullets(cleared)
+            self._new_fleet(cleared)
+            scale = self.settings.speedup_scale
+            self.ship_speed[cleared] *= scale
+            self.bullet_speed[cleared] *= scale
+            self.alien_speed[cleared] *= scale
+            self.alien_points[cleared] = (self.alien_points[cleared]
+                * self.settings.score_scale).astype(np.int64)
+            self.level[cleared] += 1
+
+    def _update_aliens(self, mask):
+        """Turn, drop and move fleets, then look for hits on the ship."""
+        alien_x, alien_y = self._alien_rects()
+
+        # A fleet turns and drops when a live column touches either edge.
+        live_cols = self.alive.any(axis=1)
+        left = np.where(live_cols, alien_x, self.screen_width).min(axis=1)
+        right = np.where(live_cols, alien_x + self.alien_width, 0).max(axis=1)
+        at_edge = mask & ((right >= self.screen_width) | (left <= 0))
+        self.fleet_dy[at_edge] += self.settings.fleet_drop_speed
+        self.fleet_direction[at_edge] *= -1
+
+        self.fleet_dx += np.where(mask,
+            self.alien_speed * self.settings.time_step * self.fleet_direction, 0.0)
+        alien_x, alien_y = self._alien_rects()
+
+        # Any live alien overlapping the ship counts as a hit.
+        ship_x = _round(self.ship_x)
+        overlap_x = ((ship_x[:, None] < alien_x + self.alien_width)
+            & (ship_x[:, None] + self.ship_width > alien_x))
+        overlap_y = ((self.ship_y < alien_y + self.alien_height)
+            & (self.ship_y + self.ship_height > alien_y))
+        touching = (self.alive & overlap_y[:, :, None]
+            & overlap_x[:, None, :]).any(axis=(1, 2))
+        self._ship_hit(mask & touching)
+
+        # So does a live alien reaching the bottom of the screen. A hit just
+        # now will have replaced the fleet, so look at it afresh.
+        alien_x, alien_y = self._alien_rects()
+        live_rows = self.alive.any(axis=2)
+        bottom = np.where(live_rows, alien_y + self.alien_height, 0).max(axis=1)
+        self._ship_hit(mask & (bottom >= self.screen_height))
+
+    def _ship_hit(self, mask):
+        """Respond to the ship being hit, as _ship_hit() does."""
+        if not mask.any():
+            return
+        spare = mask & (self.ships_left > 0)
+        self.ships_left[spare] -= 1
+        self._new_fleet(spare)
+        self._clear_bullets(spare)
+        self.ship_x[spare] = self.ship_home
+        self.pause_ticks[spare] = self.pause_length
+
+        self.active[mask & ~spare] = False
+
+def _round(values):
+    """Round to integers the way pygame does when setting a rect."""
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
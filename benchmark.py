@@ -0,0 +1,209 @@
+"""Benchmark the game's per-frame hot paths headlessly.
+
+Run `python benchmark.py --output results.json` to measure every scenario,
+and add `--baseline old.json` to compare against an earlier run.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+# resource only exists on Unix; without it peak RSS isn't reported.
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from settings import Settings
+from profiles import load_profile
+from profiler import percentile
+from startup_trace import cold_start
+
+# Every scenario runs on the same screen, large enough for a dense fleet.
+SCREEN_SIZE = (1920, 1080)
+
+def _full_fleet(ai, frame):
+    """Let a full fleet fly with no bullets in the air."""
+
+def _saturated_fire(ai, frame):
+    """Fire every tick, keeping as many bullets in flight as allowed."""
+    ai._fire_bullet()
+
+def _fleet_respawn(ai, frame):
+    """Throw the fleet away and build a new one every frame."""
+    ai.aliens.empty()
+    ai._create_fleet()
+
+def _setup_saturated_fire(settings):
+    """Allow far more bullets than the normal game does."""
+    settings.bullets_allowed = 100
+
+def _setup_formations(settings):
+    """Fly the fleets in the formations from the level script."""
+    settings.formations = 'formations/levels.json'
+
+def _setup_moving_formation(ai):
+    """Replace the first fleet with the full, moving wave of level 2."""
+    ai.stats.level = 2
+    ai.aliens.empty()
+    ai._create_fleet()
+
+def _setup_high_level(ai):
+    """Speed the game up as if many levels had been cleared."""
+    # Twenty levels in, everything moves 1.1**20 (about 6.7) times as fast.
+    for _ in range(20):
+        ai.settings.increase_speed()
+
+# Each scenario is (settings tweak, game setup, per-frame action).
+SCENARIOS = {
+    'full_fleet': (None, None, _full_fleet),
+    'saturated_fire': (_setup_saturated_fire, None, _saturated_fire),
+    'fleet_respawn': (None, None, _fleet_respawn),
+    'high_level': (None, _setup_high_level, _saturated_fire),
+    'formation': (_setup_formations, _setup_moving_formation, _saturated_fire),
+    }
+
+def run_scenario(name, frames, seed=0, profile=None):
+    """Run one scenario for frames frames and return its measurements."""
+    from alien_invasion import AlienInvasion
+
+    configure, setup, action = SCENARIOS[name]
+    random.seed(seed)
+
+    settings = Settings(profile)
+    settings.screen_width, settings.screen_height = SCREEN_SIZE
+    settings.profile = True
+    settings.profile_frames = frames
+    if configure:
+        configure(settings)
+
+    # The screen size and the scenario's tweaks are part of the profile
+    # the scenario actually ran with.
+    settings.active_profile = settings.snapshot(settings.active_profile.name)
+
+    ai = AlienInvasion(headless=True, settings=settings)
+    ai._start_game()
+    if setup:
+        setup(ai)
+
+    # A frame is one tick plus a full redraw to the off-screen surface,
+    # so regressions in drawing show up as well as in the simulation.
+    prof = ai.profiler
+    started = perf_counter()
+    for frame in range(frames):
+        # Start over if the scenario ran out of ships, so every frame
+        # exercises a live fleet.
+        if not ai.stats.game_active:
+            ai._start_game()
+            if setup:
+                setup(ai)
+        prof.begin_frame()
+
+        # The scripted action stands in for input, so it's timed as events.
+        action(ai, frame)
+        prof.mark('events')
+        ai._tick()
+        ai._update_screen()
+        prof.end_frame(len(ai.aliens), len(ai.bullets))
+    elapsed = perf_counter() - started
+    ai.close()
+
+    durations = sorted(frame[1] for frame in prof.frames)
+    phases = {phase: sum(frame[2][index] for frame in prof.frames)
+        / len(prof.frames) * 1000
+        for index, phase in enumerate(prof.PHASES)}
+    summary = prof.summary()
+    return {
+        'frames': frames,
+        'fps': frames / elapsed,
+        'p50_ms': percentile(durations, 50) * 1000,
+        'p95_ms': percentile(durations, 95) * 1000,
+        'p99_ms': percentile(durations, 99) * 1000,
+        'phase_mean_ms': phases,
+        'gc_collections': summary['gc_collections'],
+        'hud_rebuilds': ai.sb.hud_rebuilds,
+        'peak_rss_kb': _peak_rss_kb(),
+        'profile': settings.active_profile._asdict(),
+        }
+
+def compare(results, baseline, tolerance):
+    """Return a list of regressions against a baseline run."""
+    regressions = []
+    for name, result in results['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if not old:
+            continue
+
+        # Lower fps or higher tail latency both count against a scenario.
+        fps_change = result['fps'] / old['fps'] - 1
+        p99_change = result['p99_ms'] / old['p99_ms'] - 1
+        result['vs_baseline'] = {'fps': fps_change, 'p99_ms': p99_change}
+        if fps_change < -tolerance or p99_change > tolerance:
+            regressions.append(name)
+    return regressions
+
+def _peak_rss_kb():
+    """Return this process's peak resident set size in kilobytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def main(argv=None):
+    """Run the benchmarks and report the results as JSON."""
+    parser = argparse.ArgumentParser(description="Benchmark Alien Invasion.")
+    parser.add_argument('--frames', type=int, default=2000,
+        help="frames to run per scenario")
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+        help="scenario to run (default: all of them)")
+    parser.add_argument('--output', metavar='PATH',
+        help="write the results to this JSON file as well as stdout")
+    parser.add_argument('--baseline', metavar='PATH',
+        help="earlier results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+        help="fractional slowdown that counts as a regression")
+    parser.add_argument('--settings', metavar='PATH',
+        help="settings profile (.toml or .json) to run every scenario with")
+    args = parser.parse_args(argv)
+    profile = load_profile(args.settings) if args.settings else None
+
+    names = args.scenario or list(SCENARIOS)
+    results = {'screen_size': SCREEN_SIZE, 'scenarios': {}}
+
+    # A cold start runs the game in a fresh interpreter up to its first
+    # frame. The dummy video driver keeps it working without a display,
+    # and without the score store it leaves no database behind.
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy')
+    startup_args = ['--no-scores']
+    if args.settings:
+        startup_args += ['--settings', args.settings]
+    results['startup'] = cold_start(startup_args, env=env)[0]
+
+    # Each scenario gets a fresh process so its peak RSS is its own.
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results['scenarios'][name] = executor.submit(
+                run_scenario, name, args.frames, 0, profile).result()
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results['regressions'] = regressions
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report)
+
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
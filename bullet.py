@@ -1,13 +1,18 @@
 import pygame 
-from pygame.sprite import Sprite
 
-class Bullet(Sprite):
+class Bullet:
     """A class to mange bullets fried from the ship."""
 
-    def __init__(self, ai_game):
+    # Bullets are reused by BulletPool rather than created per shot, and
+    # slots keep each one down to a fixed set of fields.
+    __slots__ = ('screen', 'settings', 'color', 'rect', 'y', 'prev_y', 'pool',
+        'active')
+
+    def __init__(self, ai_game, pool):
         """Create a bullet object at the ship's current position. """
-        super().__init__()
         self.screen = ai_game.screen
+        self.pool = pool
+        self.active = False
         self.settings = ai_game.settings
         self.color = self.settings.bullet_color 
 
@@ -17,11 +22,19 @@ class Bullet(Sprite):
             self.settings.bullet_hight)
 
         #we set the bullet’s midtop attribute to match the ship’s midtop attribute
-        self.rect.midtop = ai_game.ship.rect.midtop
+        self.fire(ai_game.ship)
+
+    def fire(self, ship):
+        """Move the bullet to the ship's current position."""
+        self.rect.midtop = ship.rect.midtop
 
         # Store the bullet's position  as a decimal value
         #we can make fine adjustments to the bullet’s speed
         self.y = float(self.rect.y) 
+
+        # Where the rect's top was before the last update, so a swept
+        # collision test can cover the whole path the bullet took.
+        self.prev_y = self.rect.y
     
     def update(self):
         """Move the bullet up the screen."""
@@ -29,14 +42,111 @@ class Bullet(Sprite):
         # Update the decimal position of the bullet. 
         # When a bullet is fired, it moves up the screen, which corresponds to a decreasing y-coordinate
         # value. To update the position, we subtract the amount stored in settings.bullet_speed from self.y
-        self.y -= self.settings.bullet_speed
+        # bullet_speed is in pixels per second, so one tick covers time_step of it.
+        self.prev_y = self.rect.y
+        self.y -= self.settings.bullet_speed * self.settings.time_step
 
         # Update the rect position.
         # use the value of self.y to set the value of self.rect.y
         self.rect.y = self.y 
 
-    # The draw.rect() function fills the part of the screen defined by 
-    # the bullet’s rect with the color stored in self.color
-    def draw_bullet(self):
-        """Draw the bullet to the screen."""
-        pygame.draw.rect(self.screen, self.color, self.rect)
+    def swept_rect(self):
+        """Return the rect covering everywhere the bullet passed this tick."""
+        # The rect is stretched down to where its top was last tick. When the
+        # bullet moves less than its own height that's just its rect, the
+        # same area the discrete test uses.
+        rect = self.rect.copy()
+        rect.height = max(rect.height, self.prev_y - rect.y)
+        return rect
+
+    def kill(self):
+        """Hand the bullet back to its pool."""
+        # groupcollide() calls kill() on bullets that hit, just as it would
+        # on a sprite.
+        self.pool.release(self)
+
+class BulletPool:
+    """A class to hold a fixed set of bullets that are reused shot after shot."""
+
+    def __init__(self, ai_game):
+        """Create bullets_allowed bullets up front, all inactive."""
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+
+        # Bullets in flight, in the order they were fired, and bullets
+        # waiting to be fired again.
+        self._active = []
+        self._free = [Bullet(ai_game, self)
+            for _ in range(self.settings.bullets_allowed)]
+
+        # Every bullet looks the same, so one pre-filled surface in the
+        # screen's pixel format stands in for them all when drawing.
+        self.image = pygame.Surface((self.settings.bullet_width,
+            self.settings.bullet_hight), 0, ai_game.screen)
+        self.image.fill(self.settings.bullet_color)
+
+    def __len__(self):
+        """Return the number of bullets in flight."""
+        return len(self._active)
+
+    def __iter__(self):
+        """Iterate over the bullets in flight."""
+        return iter(self._active)
+
+    def sprites(self):
+        """Return a list of the bullets in flight, like Group.sprites()."""
+        return list(self._active)
+
+    def fire(self):
+        """Launch a bullet from the ship if one is allowed."""
+        if len(self._active) >= self.settings.bullets_allowed:
+            return
+
+        # The pool only grows if bullets_allowed went up after it was made.
+        if self._free:
+            bullet = self._free.pop()
+            bullet.fire(self.ai_game.ship)
+        else:
+            bullet = Bullet(self.ai_game, self)
+        bullet.active = True
+        self._active.append(bullet)
+
+    def release(self, bullet):
+        """Take a bullet out of flight and keep it for later."""
+        if bullet.active:
+            bullet.active = False
+            self._active.remove(bullet)
+            self._free.append(bullet)
+
+    def update(self):
+        """Move every bullet in flight."""
+        for bullet in self._active:
+            bullet.update()
+
+    def draw(self, surface):
+        """Draw every bullet in flight in one batched blit."""
+        image = self.image
+        surface.blits([(image, bullet.rect) for bullet in self._active],
+            doreturn=False)
+
+    def cull(self):
+        """Release bullets that have left the top of the screen."""
+        # Survivors are packed towards the front of the list in place, so
+        # there's no copy of the group to iterate over.
+        active = self._active
+        kept = 0
+        for bullet in active:
+            if bullet.rect.bottom > 0:
+                active[kept] = bullet
+                kept += 1
+            else:
+                bullet.active = False
+                self._free.append(bullet)
+        del active[kept:]
+
+    def empty(self):
+        """Release every bullet in flight."""
+        for bullet in self._active:
+            bullet.active = False
+        self._free.extend(self._active)
+        self._active.clear()
@@ -1,4 +1,4 @@
-import pygame.font # which lets Pygame render text to the screen
+import pygame
 
 class Button:
     # The __init__() method takes the parameters self, the ai_game
@@ -17,9 +17,11 @@ class Button:
         # and set text_color to render the text in white.
         self.text_color = (255, 255, 255)
 
-        # we prepare a font attribute for rendering text. The None argument tells Pygame 
-        # to use the default font, and 48 specifies the size of the text.
-        self.font = pygame.font.SysFont(None, 48)
+        # The font comes from the shared asset cache, which hands out one
+        # font object for every use. It isn't fetched until the button is
+        # first drawn, so a game that never shows it never opens a font.
+        self.assets = ai_game.assets
+        self.font = None
 
         # Build the button's rect object and center it.
         # To center the button on the screen, we create a rect for the button x and 
@@ -27,14 +29,27 @@ class Button:
         self.rect = pygame.Rect(0, 0, self.width ,self.height)
         self.rect.center = self.screen_rect.center 
 
-        # The button message needs to be prepped only once.
-        # we call _prep_msg() to handle this rendering.
-        self._prep_msg(msg)
+        # The button message needs to be prepped only once, the first time
+        # the image is asked for; _prep_msg() handles this rendering.
+        self.msg = msg
+        self._image = None
+
+    @property
+    def image(self):
+        """The finished button, rendered the first time it's needed."""
+        if self._image is None:
+            self._prep_msg(self.msg)
+        return self._image
 
     # helper method
     # The _prep_msg() method needs a self parameter and the text to be rendered as an image (msg).
     def _prep_msg(self, msg):
         """Turn msg into a rendered image and center text on the button."""
+        # we prepare a font attribute for rendering text. The None argument tells Pygame 
+        # to use the default font, and 48 specifies the size of the text.
+        if self.font is None:
+            self.font = self.assets.load_font(None, 48)
+
         # The call to font.render() turns the text stored in msg into an image,
         # which we then store in self.msg_image
         self.msg_image = self.font.render(msg, True, self.text_color, self.button_color)
@@ -43,14 +58,18 @@ class Button:
         # the image and setting its center attribute to match that of the button.
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
-    
+
+        # The finished button is drawn once onto its own image, so showing
+        # it is a single blit rather than a fill and a blit every frame.
+        self._image = pygame.Surface(self.rect.size, 0, self.screen)
+        self._image.fill(self.button_color)
+        self._image.blit(self.msg_image, self.msg_image_rect.move(
+            -self.rect.x, -self.rect.y))
+
 
     def draw_button(self):
         """ Draw blank button and then draw message."""
 
-        # We call screen.fill() to draw the rectangular portion of the button.
-        self.screen.fill(self.button_color, self.rect)
-
-        # we call screen.blit() to draw the text image to the screen, passing it 
-        # an image and the rect object associated with the image.
-        self.screen.blit(self.msg_image, self.msg_image_rect)
\ No newline at end of file
+        # we call screen.blit() to draw the button image to the screen, passing it 
+        # the image and the rect object associated with the button.
+        self.screen.blit(self.image, self.rect)
@@ -0,0 +1,156 @@
+import math
+
+class SpatialHash:
+    """A uniform grid over the fleet for finding bullet-alien hits."""
+
+    def __init__(self):
+        """Initialize an empty grid."""
+        # Each cell maps to the aliens whose rect overlaps it, and each
+        # alien remembers the cells it was filed under so it can be
+        # removed again without a search.
+        self._cells = {}
+        self._alien_cells = {}
+
+        # Where each alien was when the grid was built. The fleet moves
+        # as one block, so the distance any live alien has travelled from
+        # its home is the offset for the whole grid.
+        self._homes = {}
+        self._anchor = None
+
+        # How far, in pixels, an alien can stray from where the block
+        # offset puts it when a formation moves aliens within the block.
+        self._reach = (0, 0)
+
+        self._valid = False
+        self._sync = None
+
+    def invalidate(self, reach=(0, 0)):
+        """Force the grid to be rebuilt before the next query.
+
+        reach is how far across and down a new fleet's formation can move
+        any alien from its place in the block.
+        """
+        self._valid = False
+        self._reach = reach
+
+    def _rebuild(self, aliens):
+        """File every alien in the group under the cells it overlaps."""
+        self._cells = {}
+        self._alien_cells = {}
+        self._homes = {}
+        self._anchor = None
+        if self._sync:
+            self._sync()
+
+        sprites = aliens.sprites()
+        if sprites:
+            # One cell per alien-sized block keeps every cell's list short.
+            self.cell_width, self.cell_height = sprites[0].rect.size
+            for order, alien in enumerate(sprites):
+                self._homes[alien] = (alien.rect.x, alien.rect.y, order)
+                cells = self._cells_for(alien.rect.x, alien.rect.y,
+                    alien.rect.width, alien.rect.height)
+                self._alien_cells[alien] = cells
+                for cell in cells:
+                    self._cells.setdefault(cell, []).append(alien)
+            self._anchor = sprites[0]
+
+        self._valid = True
+
+    def _cells_for(self, x, y, width, height):
+        """Return the cells covered by a rect given in grid coordinates."""
+        left = x // self.cell_width
+        right = (x + width - 1) // self.cell_width
+        top = y // self.cell_height
+        bottom = (y + height - 1) // self.cell_height
+        return [(col, row) for col in range(left, right + 1)
+            for row in range(top, bottom + 1)]
+
+    def _remove(self, alien):
+        """Take an alien out of the grid."""
+        for cell in self._alien_cells.pop(alien, ()):
+            self._cells[cell].remove(alien)
+        self._homes.pop(alien, None)
+
+        # If the anchor died, any surviving alien can take its place.
+        if alien is self._anchor:
+            self._anchor = next(iter(self._homes), None)
+
+    def _offset(self):
+        """Return how far the fleet has moved since the grid was built."""
+        home_x, home_y, _ = self._homes[self._anchor]
+        if self._sync:
+            self._sync((self._anchor,))
+        return self._anchor.rect.x - home_x, self._anchor.rect.y - home_y
+
+    def collide(self, rect):
+        """Return the aliens whose rects overlap rect, in group order."""
+        if self._anchor is None:
+            return []
+
+        offset_x, offset_y = self._offset()
+
+        # Float positions are rounded alien by alien, so a straggler can
+        # sit a pixel away from where the block offset puts it. Widening
+        # the search by a couple of pixels keeps those in the candidates;
+        # the exact rect test below throws out anything that doesn't hit.
+        # In a moving formation every alien, the anchor included, can be
+        # up to the formation's reach from its place in the block, both
+        # when the grid was built and now. Growing the search by four
+        # times the reach covers that, so the grid never has to be rebuilt.
+        reach_x, reach_y = self._reach
+        margin_x = 2 + math.ceil(4 * reach_x)
+        margin_y = 2 + math.ceil(4 * reach_y)
+        cells = self._cells_for(rect.x - offset_x - margin_x,
+            rect.y - offset_y - margin_y,
+            rect.width + 2 * margin_x, rect.height + 2 * margin_y)
+
+        candidates = set()
+        for cell in cells:
+            candidates.update(self._cells.get(cell, ()))
+        if self._sync:
+            self._sync(candidates)
+
+        hits = [alien for alien in candidates if rect.colliderect(alien.rect)]
+        hits.sort(key=lambda alien: self._homes[alien][2])
+        return hits
+
+    def groupcollide(self, bullets, aliens, dokill_bullets, dokill_aliens,
+            swept=False):
+        """Return {bullet: [aliens]} like pygame.sprite.groupcollide().
+
+        With swept set, each bullet is tested along the whole path it took
+        this tick and hits only the first alien on it.
+        """
+        if not bullets or not aliens:
+            return {}
+
+        # A VectorFleet only writes its aliens' rects on request, so the
+        # grid asks for the ones it's about to look at.
+        self._sync = getattr(aliens, 'sync_rects', None)
+
+        # A new fleet, or aliens that vanished some other way, means the
+        # grid no longer matches the group.
+        if not self._valid or len(self._homes) != len(aliens):
+            self._rebuild(aliens)
+
+        collisions = {}
+        for bullet in bullets.sprites():
+            if swept:
+                hits = self.collide(bullet.swept_rect())
+
+                # Bullets fly up the screen, so the first alien on the path
+                # is the lowest one. Ties go to the first in group order.
+                if len(hits) > 1:
+                    hits = [max(hits, key=lambda alien: alien.rect.bottom)]
+            else:
+                hits = self.collide(bullet.rect)
+            if hits:
+                collisions[bullet] = hits
+                if dokill_aliens:
+                    for alien in hits:
+                        alien.kill()
+                        self._remove(alien)
+                if dokill_bullets:
+                    bullet.kill()
+        return collisions
@@ -0,0 +1,394 @@
+from functools import lru_cache
+from itertools import repeat
+
+import pygame
+
+# NumPy is optional; without it the game keeps using a plain sprite group.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+@lru_cache(maxsize=8)
+def fleet_layout(screen_width, screen_height, alien_width, alien_height, ship_height):
+    """Return the (x, y) of every alien in a fresh fleet, row by row."""
+    # Spacing between each alien is equal to one alien width.
+    # we calculate the horizontal space available for aliens and 
+    # the number of aliens that can fit into that space.
+    available_space_x = screen_width - (2 * alien_width)
+    number_aliens_x = available_space_x // (2 * alien_width)
+
+    # Determine the number of rows of aliens that fit on the screen,
+    # leaving room for the ship and three alien heights of empty space.
+    available_space_y = screen_height - (3 * alien_height) - ship_height
+    number_rows = available_space_y // (2 * alien_height)
+
+    # Each alien starts one alien width in from the left and one alien
+    # height down from the top, with a gap the size of an alien between
+    # neighbours in both directions.
+    return tuple(
+        (alien_width + 2 * alien_width * alien_number,
+            alien_height + 2 * alien_height * row_number)
+        for row_number in range(number_rows)
+        for alien_number in range(number_aliens_x))
+
+class FleetBounds:
+    """A class to track the live fleet's extent as aliens are shot down."""
+
+    def __init__(self, ai_game):
+        """Initialize bounds for a fleet on the game's screen."""
+        self.screen_rect = ai_game.screen.get_rect()
+        self.settings = ai_game.settings
+
+        # The aliens and layout the columns and rows were worked out for.
+        self._aliens = None
+        self._layout = None
+
+        # A VectorFleet, whose arrays give the live fleet's extent.
+        self._vector = None
+
+        # Until the first fleet arrives there's nothing at any edge.
+        self._left_alien = self._right_alien = self._bottom_alien = None
+
+    def reset(self, aliens, layout, vector=None):
+        """Start tracking a full fleet of aliens placed as in layout.
+
+        Pass the fleet as vector if it's a VectorFleet.
+        """
+        # A formation's aliens don't keep to columns and rows, so a moving
+        # VectorFleet's extent comes straight from its arrays. A rigid one
+        # still uses the stand-ins below, read from its arrays instead of
+        # rects, which it only writes when something needs them.
+        self._vector = vector
+        if vector is not None and vector.motion is not None:
+            return
+
+        # The fleet moves as one, so every alien in a column shares its x
+        # and every alien in a row its y. The grid only has to be worked
+        # out again when the pooled aliens or the layout change.
+        if aliens is not self._aliens or layout is not self._layout:
+            column_of = {x: index
+                for index, x in enumerate(sorted({x for x, _ in layout}))}
+            row_of = {y: index
+                for index, y in enumerate(sorted({y for _, y in layout}))}
+            self._columns = [[] for _ in column_of]
+            self._rows = [[] for _ in row_of]
+            self._slots = {}
+            for alien, (x, y) in zip(aliens, layout):
+                column, row = column_of[x], row_of[y]
+                self._columns[column].append(alien)
+                self._rows[row].append(alien)
+                self._slots[alien] = (column, row)
+            self._aliens = aliens
+            self._layout = layout
+
+        # How many aliens are still alive in each column and row.
+        self._column_counts = [len(line) for line in self._columns]
+        self._row_counts = [len(line) for line in self._rows]
+
+        # One live alien each from the leftmost and rightmost columns and
+        # the lowest row stands in for the whole fleet's edges.
+        self._left, self._left_alien = self._find(self._columns,
+            self._column_counts, 0, 1)
+        self._right, self._right_alien = self._find(self._columns,
+            self._column_counts, len(self._columns) - 1, -1)
+        self._bottom, self._bottom_alien = self._find(self._rows,
+            self._row_counts, len(self._rows) - 1, -1)
+
+    def remove(self, alien):
+        """Take a dead alien out of its column and row."""
+        if self._vector is not None and self._vector.motion is not None:
+            return
+        column, row = self._slots[alien]
+        self._column_counts[column] -= 1
+        self._row_counts[row] -= 1
+
+        # Only losing one of the stand-ins means looking for another, and
+        # the search carries on inwards from where the old one was.
+        if alien is self._left_alien:
+            self._left, self._left_alien = self._find(self._columns,
+                self._column_counts, self._left, 1)
+        if alien is self._right_alien:
+            self._right, self._right_alien = self._find(self._columns,
+                self._column_counts, self._right, -1)
+        if alien is self._bottom_alien:
+            self._bottom, self._bottom_alien = self._find(self._rows,
+                self._row_counts, self._bottom, -1)
+
+    def at_edge(self):
+        """Return True if any live alien is at an edge of the screen."""
+        vector = self._vector
+        if vector is not None and vector.motion is not None:
+            extent = vector.extent()
+            if extent is None:
+                return False
+            left, right, _ = extent
+
+            # An alien in a moving formation can still be over the edge the
+            # tick after the fleet turns, so only the edge the fleet is
+            # heading for counts; otherwise it would turn straight back.
+            if self.settings.fleet_direction > 0:
+                return right >= self.screen_rect.right
+            return left <= 0
+
+        if self._left_alien is None:
+            return False
+        if vector is not None:
+            left = int(vector.rect_x[self._left_alien.index])
+            right = int(vector.rect_x[self._right_alien.index]) + vector.width
+        else:
+            left = self._left_alien.rect.left
+            right = self._right_alien.rect.right
+        return right >= self.screen_rect.right or left <= 0
+
+    def at_bottom(self):
+        """Return True if any live alien has reached the screen's bottom."""
+        vector = self._vector
+        if vector is not None and vector.motion is not None:
+            extent = vector.extent()
+            return extent is not None and extent[2] >= self.screen_rect.bottom
+
+        if self._bottom_alien is None:
+            return False
+        if vector is not None:
+            bottom = int(vector.rect_y[self._bottom_alien.index]) + vector.height
+        else:
+            bottom = self._bottom_alien.rect.bottom
+        return bottom >= self.screen_rect.bottom
+
+    def _find(self, lines, counts, start, step):
+        """Return the first line with a live alien from start, and that alien."""
+        index = start
+        while 0 <= index < len(counts):
+            if counts[index]:
+                for alien in lines[index]:
+                    if alien.alive():
+                        return index, alien
+            index += step
+        return index, None
+
+class VectorFleet(pygame.sprite.Group):
+    """A sprite group that keeps the fleet's state in NumPy arrays."""
+
+    def __init__(self, ai_game):
+        """Initialize an empty fleet."""
+        super().__init__()
+        self.settings = ai_game.settings
+        self.screen_rect = ai_game.screen.get_rect()
+
+        # Every alien ever added since the fleet was last emptied, in the
+        # order it was added. An alien's index into this list is also its
+        # index into the position arrays.
+        self._aliens = []
+
+        # The arrays are built lazily from the sprites the first time the
+        # fleet moves, so aliens can still be added one by one.
+        self._packed = False
+
+        # The layout last passed to populate() and its positions as arrays.
+        self._layout = None
+
+        # A formation's motion moves aliens about within the block, by
+        # offsets that depend on how long the fleet has been flying.
+        self.motion = None
+        self.clock = 0.0
+        self._extent = None
+
+        # The arrays are the real positions; the aliens' rects are only
+        # brought up to date by sync_rects(), when something reads them.
+        self._stale = False
+
+    @staticmethod
+    def available():
+        """Return True if NumPy could be imported."""
+        return np is not None
+
+    def add_internal(self, sprite, layer=None):
+        """Register a new alien and give it a slot in the arrays."""
+        if self._packed:
+            # Hand the current positions back to the sprites before the
+            # arrays are rebuilt with the newcomer.
+            self.sync_rects()
+            for alien, x in zip(self._aliens, self.x.tolist()):
+                alien.x = x
+            self._packed = False
+            self._layout = None
+
+            # Aliens added one at a time aren't part of a formation.
+            self.motion = None
+
+        super().add_internal(sprite)
+        sprite.index = len(self._aliens)
+        self._aliens.append(sprite)
+
+    def populate(self, aliens, layout, motion=None):
+        """Fill the empty fleet with pooled aliens placed as in layout."""
+        # A screen too small for a single alien gets an empty fleet.
+        if not aliens:
+            return
+
+        # Each alien keeps the same slot every time it's reused.
+        for index, alien in enumerate(aliens):
+            alien.index = index
+            alien.add_internal(self)
+        self.spritedict = dict.fromkeys(aliens)
+        self._aliens = aliens
+
+        # The layout's arrays are built once and copied in from then on.
+        if layout is not self._layout:
+            self._layout = layout
+            self._home_x = np.array([x for x, _ in layout], dtype=float)
+            self._home_y = np.array([y for _, y in layout], dtype=int)
+            self.x = self._home_x.copy()
+            self.y = self._home_y.copy()
+            self.alive = np.ones(len(layout), dtype=bool)
+        else:
+            np.copyto(self.x, self._home_x)
+            np.copyto(self.y, self._home_y)
+            self.alive.fill(True)
+
+        self.width, self.height = aliens[0].rect.size
+        self._packed = True
+        self.motion = motion
+        self.clock = 0.0
+        self._place()
+
+    def remove_internal(self, sprite):
+        """Mark an alien as dead when it leaves the group."""
+        super().remove_internal(sprite)
+        if not self.spritedict:
+            # Once the whole fleet is gone we can forget the old slots.
+            self._aliens = []
+            self._packed = False
+            self._stale = False
+        elif self._packed:
+            self.alive[sprite.index] = False
+            self._extent = None
+
+    def empty(self):
+        """Remove every alien at once."""
+        # Group.empty() removes the aliens one by one, and each removal
+        # marks the alien dead in the arrays. Here the aliens only have to
+        # forget the group; the arrays are overwritten by the next fleet.
+        for alien in self.spritedict:
+            alien.remove_internal(self)
+        self.spritedict.clear()
+        self._aliens = []
+        self._packed = False
+        self._stale = False
+        self._extent = None
+
+    def _pack(self):
+        """Copy the aliens' positions into contiguous arrays."""
+        self.x = np.array([alien.x for alien in self._aliens], dtype=float)
+        self.y = np.array([alien.rect.y for alien in self._aliens], dtype=int)
+        self.alive = np.array(
+            [alien in self.spritedict for alien in self._aliens], dtype=bool)
+
+        # Every alien shares the same image, so one size covers the fleet.
+        self.width, self.height = self._aliens[0].rect.size
+        self._packed = True
+
+    @staticmethod
+    def _round(values):
+        """Return the integers pygame would store for values in a rect."""
+        # pygame rounds halves away from zero when a float is assigned to
+        # a rect, so we do the same to keep rects and arrays in step.
+        return np.trunc(values + np.copysign(0.5, values)).astype(int)
+
+    def _place(self):
+        """Work out every alien's rect position from the arrays."""
+        # A formation's offsets are added on the way out; x and y stay the
+        # block's positions, so the sweep and drops work as they always do.
+        if self.motion is None:
+            self.rect_x = self._round(self.x)
+            self.rect_y = self.y
+        else:
+            dx, dy = self.motion.offsets(self.clock)
+            self.rect_x = self._round(self.x + dx)
+            self.rect_y = self.y + self._round(dy)
+        self._extent = None
+
+        # Writing every rect is a Python loop over the whole fleet, so it
+        # waits until something needs the rects.
+        self._stale = True
+
+    def sync_rects(self, aliens=None):
+        """Write the array positions back to the aliens' rects.
+
+        With aliens given, only their rects are written.
+        """
+        # This keeps the group usable by drawing and groupcollide(), which
+        # only look at each sprite's rect.
+        if not self._stale:
+            return
+        if aliens is None:
+            for alien, x, y in zip(self._aliens, self.rect_x.tolist(),
+                    self.rect_y.tolist()):
+                alien.rect.x = x
+                alien.rect.y = y
+            self._stale = False
+        else:
+            for alien in aliens:
+                alien.rect.x = int(self.rect_x[alien.index])
+                alien.rect.y = int(self.rect_y[alien.index])
+
+    def draw(self, surface):
+        """Draw every live alien in one batched blit, straight from the arrays."""
+        if not self._packed:
+            # The sprites' own rects are up to date until the fleet moves.
+            surface.blits([(alien.image, alien.rect) for alien in self],
+                doreturn=False)
+            return
+
+        # Every alien shares the same image, and the arrays are in the
+        # group's order, so this draws exactly what Group.draw() would
+        # without writing a single rect.
+        alive = self.alive
+        surface.blits(zip(repeat(self._aliens[0].image),
+            zip(self.rect_x[alive].tolist(), self.rect_y[alive].tolist())),
+            doreturn=False)
+
+    def overlaps(self, rect):
+        """Return True if any live alien's rect overlaps rect."""
+        if not self._packed:
+            # The sprites' own rects are up to date until the fleet moves.
+            return any(rect.colliderect(alien.rect) for alien in self)
+
+        # The same test as Rect.colliderect(), for every alien at once.
+        return bool((self.alive
+            & (self.rect_x < rect.right) & (self.rect_x + self.width > rect.x)
+            & (self.rect_y < rect.bottom) & (self.rect_y + self.height > rect.y)
+            ).any())
+
+    def extent(self):
+        """Return the live fleet's (left, right, bottom), or None if empty."""
+        # Worked out from the arrays at most once per move.
+        if self._extent is None and self._packed and self.alive.any():
+            left = int(self.rect_x[self.alive].min())
+            right = int(self.rect_x[self.alive].max()) + self.width
+            bottom = int(self.rect_y[self.alive].max()) + self.height
+            self._extent = (left, right, bottom)
+        return self._extent
+
+    def drop(self):
+        """Drop the whole fleet by fleet_drop_speed in one operation."""
+        if not self.spritedict:
+            return
+        if not self._packed:
+            self._pack()
+
+        self.y += self.settings.fleet_drop_speed
+        self._place()
+
+    def update(self):
+        """Move the whole fleet left or right in one operation."""
+        if not self.spritedict:
+            return
+        if not self._packed:
+            self._pack()
+
+        self.x += (self.settings.alien_speed * self.settings.time_step
+            * self.settings.fleet_direction)
+        self.clock += self.settings.time_step
+        self._place()
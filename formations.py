@@ -0,0 +1,186 @@
+import json
+import math
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+# NumPy is optional; without it formations are still laid out, but they
+# move as one rigid block like the classic fleet.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from fleet import fleet_layout
+
+# A formation as read from its file. pattern is tiled over the grid the
+# classic fleet fills, 'X' for an alien and anything else for a gap.
+# motion is a tuple of Motions, each moving the aliens along a sine wave
+# on top of the fleet's usual sweep across the screen.
+FormationSpec = namedtuple('FormationSpec', ('name', 'pattern', 'motion'))
+
+# kind is one of MOTIONS. amplitude is in alien widths (for sideways
+# motion) or heights (for up and down), period is in seconds, and phase
+# is how far each column or row is behind the one before it, in radians.
+Motion = namedtuple('Motion', ('kind', 'amplitude', 'period', 'phase'))
+
+# A formation ready for a given screen: where every alien starts, and the
+# FormationMotion that moves them, or None if they move as one block.
+Formation = namedtuple('Formation', ('layout', 'motion'))
+
+# 'wave' bobs the aliens up and down, a column at a time. 'columns' moves
+# neighbouring columns up and down in opposite directions. 'sway' moves
+# neighbouring rows from side to side in opposite directions. 'pulse'
+# spreads the columns out and draws them in again.
+MOTIONS = ('wave', 'columns', 'sway', 'pulse')
+
+def load_formation(path):
+    """Read the formation in a .json file and validate it."""
+    with open(path) as f:
+        values = json.load(f)
+    if not isinstance(values, dict):
+        raise ValueError(f"{path}: a formation must be a table of settings")
+
+    # A formation is named after its file unless it says otherwise.
+    name = str(values.get('name', os.path.splitext(os.path.basename(path))[0]))
+
+    pattern = values.get('pattern', ['X'])
+    if (not isinstance(pattern, list) or not pattern
+            or not all(isinstance(line, str) and line for line in pattern)
+            or 'X' not in ''.join(pattern)):
+        raise ValueError(f"{path}: pattern must be a list of strings with "
+            "at least one 'X'")
+
+    entries = values.get('motion', [])
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: motion must be a list")
+
+    motion = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError(f"{path}: each motion must be a table of settings")
+        kind = entry.get('kind')
+        if kind not in MOTIONS:
+            raise ValueError(f"{path}: unknown motion: {kind!r}")
+        numbers = [entry.get('amplitude', 0.5), entry.get('period', 2.0),
+            entry.get('phase', 0.0)]
+        if not all(isinstance(number, (int, float))
+                and not isinstance(number, bool) for number in numbers):
+            raise ValueError(f"{path}: {kind} motion needs numbers")
+        amplitude, period, phase = (float(number) for number in numbers)
+        if amplitude < 0 or period <= 0:
+            raise ValueError(f"{path}: {kind} motion is out of range")
+        motion.append(Motion(kind, amplitude, period, phase))
+
+    return FormationSpec(name, tuple(pattern), tuple(motion))
+
+@lru_cache(maxsize=8)
+def load_levels(path):
+    """Return the FormationSpec for each level in a level script."""
+    # The script lists formations by name; each one is a file of that
+    # name next to the script. Every file is read once.
+    with open(path) as f:
+        values = json.load(f)
+    names = values.get('levels') if isinstance(values, dict) else None
+    if not names or not all(isinstance(name, str) for name in names):
+        raise ValueError(f"{path}: levels must be a list of formation names")
+
+    folder = os.path.dirname(path)
+    specs = {}
+    for name in set(names):
+        specs[name] = load_formation(os.path.join(folder, f"{name}.json"))
+    return tuple(specs[name] for name in names)
+
+def formation_for_level(path, level):
+    """Return the FormationSpec the level script at path gives level."""
+    # Once the script runs out, it starts again from the top.
+    levels = load_levels(path)
+    return levels[(level - 1) % len(levels)]
+
+@lru_cache(maxsize=16)
+def compile_formation(spec, screen_width, screen_height, alien_width,
+        alien_height, ship_height):
+    """Return the Formation spec makes on a screen of the given size."""
+    # The pattern is cut out of the classic grid, so a formation of all
+    # 'X's is exactly the classic fleet.
+    grid = fleet_layout(screen_width, screen_height, alien_width,
+        alien_height, ship_height)
+    layout = []
+    cells = []
+    pattern = spec.pattern
+    for x, y in grid:
+        column = (x - alien_width) // (2 * alien_width)
+        row = (y - alien_height) // (2 * alien_height)
+        line = pattern[row % len(pattern)]
+        if line[column % len(line)] == 'X':
+            layout.append((x, y))
+            cells.append((column, row))
+
+    # On a small screen the grid can miss every 'X' in a sparse pattern.
+    # Rather than send an empty fleet, the level gets the full grid.
+    if not layout:
+        layout = list(grid)
+        cells = [((x - alien_width) // (2 * alien_width),
+            (y - alien_height) // (2 * alien_height)) for x, y in grid]
+
+    motion = None
+    if spec.motion and np is not None and cells:
+        motion = FormationMotion(spec.motion, cells, alien_width, alien_height)
+    return Formation(tuple(layout), motion)
+
+class FormationMotion:
+    """The motion of a formation, compiled to arrays with a slot per alien."""
+
+    def __init__(self, motion, cells, alien_width, alien_height):
+        """Work out every alien's share of each Motion from its grid cell."""
+        columns = np.array([column for column, _ in cells], dtype=float)
+        rows = np.array([row for _, row in cells], dtype=float)
+
+        # Alternate columns and rows move in opposite directions.
+        column_sign = np.where(columns % 2, -1.0, 1.0)
+        row_sign = np.where(rows % 2, -1.0, 1.0)
+
+        # How far each column is from the middle of the formation, from
+        # -1 at one side to 1 at the other.
+        middle = (columns.min() + columns.max()) / 2
+        spread = (columns - middle) / max(middle - columns.min(), 1)
+
+        # Each Motion becomes a row of these arrays: every alien moves by
+        # (dx, dy) * sin(speed * t + phase), with its own dx, dy and phase.
+        zeros = np.zeros(len(cells))
+        dx, dy, phase, speed = [], [], [], []
+        for kind, amplitude, period, step in motion:
+            across = amplitude * alien_width
+            down = amplitude * alien_height
+            if kind == 'wave':
+                dx.append(zeros)
+                dy.append(np.full(len(cells), down))
+                phase.append(step * columns)
+            elif kind == 'columns':
+                dx.append(zeros)
+                dy.append(down * column_sign)
+                phase.append(step * columns)
+            elif kind == 'sway':
+                dx.append(across * row_sign)
+                dy.append(zeros)
+                phase.append(step * rows)
+            else:
+                dx.append(across * spread)
+                dy.append(zeros)
+                phase.append(step * rows)
+            speed.append(2 * math.pi / period)
+
+        self._dx = np.array(dx)
+        self._dy = np.array(dy)
+        self._phase = np.array(phase)
+        self._speed = np.array(speed)[:, None]
+
+        # The furthest any alien can stray from its place in the block.
+        self.reach = (float(np.abs(self._dx).sum(axis=0).max()),
+            float(np.abs(self._dy).sum(axis=0).max()))
+
+    def offsets(self, t):
+        """Return every alien's (dx, dy) from its place in the block at t."""
+        # One sine per Motion per alien, all in a single array operation.
+        wave = np.sin(self._speed * t + self._phase)
+        return (self._dx * wave).sum(axis=0), (self._dy * wave).sum(axis=0)
@@ -0,0 +1,43 @@
+import pygame
+
+class GlyphAtlas:
+    """A class to build number images from glyphs rendered only once."""
+
+    # Characters rendered up front; anything else is rendered on first use.
+    CHARACTERS = '0123456789,'
+
+    def __init__(self, font, text_color, bg_color):
+        """Render every glyph for this font and colour pair."""
+        self.font = font
+        self.text_color = text_color
+        self.bg_color = bg_color
+        self.height = font.get_height()
+
+        self._glyphs = {}
+        for char in self.CHARACTERS:
+            self._glyph(char)
+
+    def _glyph(self, char):
+        """Return the cached image for char, rendering it if needed."""
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            glyph = self.font.render(char, True, self.text_color, self.bg_color)
+            self._glyphs[char] = glyph
+        return glyph
+
+    def render(self, text):
+        """Return an image of text put together from cached glyphs."""
+        glyphs = [self._glyph(char) for char in text]
+        width = sum(glyph.get_width() for glyph in glyphs)
+
+        image = pygame.Surface((width, self.height))
+        image.fill(self.bg_color)
+
+        # Lay the glyphs side by side in a single batched blit.
+        x = 0
+        placements = []
+        for glyph in glyphs:
+            placements.append((glyph, (x, 0)))
+            x += glyph.get_width()
+        image.blits(placements, doreturn=False)
+        return image
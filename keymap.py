@@ -0,0 +1,35 @@
+import pygame
+
+# Everything a player can ask the game to do. Recordings refer to actions
+# by their position in this tuple, so new actions go on the end.
+ACTIONS = ('move_left', 'move_right', 'fire', 'quit', 'play')
+
+class KeyMap:
+    """A class to map keys to the actions they trigger."""
+
+    def __init__(self, bindings):
+        """Bind each action to its keys, e.g. {'fire': ('K_SPACE',)}."""
+        self._actions = {}
+        for action, keys in bindings.items():
+            for key in keys:
+                self.bind(action, key)
+
+    def bind(self, action, key):
+        """Make key trigger action; a key name like 'K_a' or a key code."""
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action: {action}")
+        self._actions[_key_code(key)] = action
+
+    def unbind(self, key):
+        """Stop key from triggering anything."""
+        self._actions.pop(_key_code(key), None)
+
+    def action_for(self, key):
+        """Return the action bound to key, or None."""
+        return self._actions.get(key)
+
+def _key_code(key):
+    """Return the pygame key code for a key name or code."""
+    if isinstance(key, str):
+        return getattr(pygame, key)
+    return key
@@ -0,0 +1,140 @@
+import csv
+import gc
+import json
+from collections import deque
+from time import perf_counter
+
+import pygame.font
+
+class FrameProfiler:
+    """A class to record where the time goes in each frame."""
+
+    # The phases of a frame, in the order the main loop runs them.
+    PHASES = ('events', 'ship', 'bullets', 'aliens', 'screen', 'sprites', 'score')
+
+    def __init__(self, capacity=600, assets=None):
+        """Initialize an empty ring buffer holding capacity frames."""
+        # Each entry is one frame: when it started, how long it took, the
+        # seconds spent in each phase, how many sprites were alive, and how
+        # many garbage collections ran and how long they paused the game.
+        # Old frames fall off the front once the buffer is full.
+        self.frames = deque(maxlen=capacity)
+
+        self._phase_times = dict.fromkeys(self.PHASES, 0.0)
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+
+        # The collector tells us when it starts and stops, so allocation
+        # churn shows up as counted pauses.
+        self._gc_count = 0
+        self._gc_pause = 0.0
+        self._gc_start = 0.0
+        gc.callbacks.append(self._on_gc)
+
+        # The overlay font is only created the first time it's drawn, from
+        # the game's asset cache if we were given one.
+        self._assets = assets
+        self._font = None
+
+        # How long startup took, in seconds, once the game fills it in.
+        self.startup = {}
+
+    def begin_frame(self):
+        """Start timing a new frame."""
+        self._frame_start = self._last_mark = perf_counter()
+        for phase in self.PHASES:
+            self._phase_times[phase] = 0.0
+        self._gc_count = 0
+        self._gc_pause = 0.0
+
+    def mark(self, phase):
+        """Charge the time since the last mark to phase."""
+        # A frame can run several ticks, so phase times add up.
+        now = perf_counter()
+        self._phase_times[phase] += now - self._last_mark
+        self._last_mark = now
+
+    def end_frame(self, aliens, bullets):
+        """Finish the frame and store it in the ring buffer."""
+        duration = perf_counter() - self._frame_start
+        phases = tuple(self._phase_times[phase] for phase in self.PHASES)
+        self.frames.append((self._frame_start, duration, phases, aliens,
+            bullets, self._gc_count, self._gc_pause))
+
+    def detach(self):
+        """Stop listening to the garbage collector."""
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def _on_gc(self, phase, info):
+        """Count a garbage collection and time its pause."""
+        if phase == 'start':
+            self._gc_start = perf_counter()
+        else:
+            self._gc_count += 1
+            self._gc_pause += perf_counter() - self._gc_start
+
+    def summary(self):
+        """Return FPS and p50/p99 frame times (ms) over the buffer."""
+        if len(self.frames) < 2:
+            return {'fps': 0.0, 'p50_ms': 0.0, 'p99_ms': 0.0,
+                'gc_collections': 0, 'gc_pause_ms': 0.0}
+
+        durations = sorted(frame[1] for frame in self.frames)
+        elapsed = self.frames[-1][0] - self.frames[0][0]
+        return {
+            'fps': (len(self.frames) - 1) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(durations, 50) * 1000,
+            'p99_ms': percentile(durations, 99) * 1000,
+            'gc_collections': sum(frame[5] for frame in self.frames),
+            'gc_pause_ms': sum(frame[6] for frame in self.frames) * 1000,
+            }
+
+    def draw_overlay(self, screen):
+        """Draw FPS, frame-time percentiles and sprite counts on screen."""
+        if self._font is None:
+            if self._assets:
+                self._font = self._assets.load_font(None, 24)
+            else:
+                self._font = pygame.font.SysFont(None, 24)
+
+        summary = self.summary()
+        aliens, bullets = self.frames[-1][3:5] if self.frames else (0, 0)
+        lines = [
+            f"fps {summary['fps']:.0f}",
+            f"p50 {summary['p50_ms']:.2f} ms  p99 {summary['p99_ms']:.2f} ms",
+            f"aliens {aliens}  bullets {bullets}",
+            ]
+        if self.startup:
+            lines.append("startup " + "  ".join(f"{name} {seconds * 1000:.0f} ms"
+                for name, seconds in self.startup.items()))
+
+        # Stack the lines up from the bottom-left corner of the screen.
+        y = screen.get_rect().bottom - 10
+        for line in reversed(lines):
+            image = self._font.render(line, True, (0, 0, 0), (255, 255, 255))
+            y -= image.get_height()
+            screen.blit(image, (10, y))
+
+    def dump(self, path):
+        """Write the buffered frames to path as CSV or JSON."""
+        header = (['start', 'frame'] + list(self.PHASES)
+            + ['alien_count', 'bullet_count', 'gc_count', 'gc_pause'])
+        rows = [[start, duration, *phases, *counts]
+            for start, duration, phases, *counts in self.frames]
+
+        # The file extension picks the format.
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({'summary': self.summary(), 'startup': self.startup,
+                    'columns': header, 'frames': rows}, f)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(rows)
+
+def percentile(ordered, percent):
+    """Return the nearest-rank percentile of an already sorted list."""
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[int(index)]
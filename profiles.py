@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+
+# tomllib is only in the standard library from Python 3.11; without it
+# profiles can still be written as JSON.
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+from settings import PROFILE_FIELDS, Settings
+
+# Settings that are baked into the screen and the game's surfaces when it
+# starts. A hot reload leaves these alone; they take effect on a restart.
+RESTART_FIELDS = ('screen_width', 'screen_height', 'bg_color', 'bullet_width',
+    'bullet_hight', 'bullet_color', 'fleet_backend', 'dirty_rects')
+
+# Settings that must be above zero, and settings limited to a few values.
+# Every other number just can't be negative; a max_fps of 0 leaves the
+# frame rate uncapped.
+POSITIVE_FIELDS = ('screen_width', 'screen_height', 'tick_rate',
+    'max_frame_time', 'ship_speed', 'bullet_speed', 'alien_speed',
+    'alien_points', 'speedup_scale')
+CHOICES = {
+    'fleet_backend': ('sprites', 'numpy'),
+    'collision_mode': ('discrete', 'swept'),
+    }
+
+def load_profile(path):
+    """Read the settings profile in a .toml or .json file and validate it."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise ValueError(f"{path}: reading TOML needs Python 3.11 or later.")
+        values = tomllib.loads(data.decode())
+    else:
+        values = json.loads(data)
+    if not isinstance(values, dict):
+        raise ValueError(f"{path}: a profile must be a table of settings.")
+
+    # A profile is named after its file unless it says otherwise.
+    name = values.pop('name', os.path.splitext(os.path.basename(path))[0])
+    return validate_profile(name, values)
+
+def validate_profile(name, values):
+    """Return a SettingsProfile of the defaults overridden by values."""
+    defaults = Settings().active_profile
+    checked = {}
+    for field, value in values.items():
+        if field not in PROFILE_FIELDS:
+            raise ValueError(f"Unknown setting: {field}")
+        checked[field] = _check_value(field, value, getattr(defaults, field))
+    return defaults._replace(name=str(name), **checked)
+
+def _check_value(field, value, default):
+    """Return value in the type of field's default, or raise ValueError."""
+    # Each value must have the same type as the default it replaces,
+    # except that whole numbers are fine where a float is expected and
+    # colours come from the file as lists.
+    if isinstance(default, bool):
+        valid = isinstance(value, bool)
+    elif isinstance(default, int):
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif isinstance(default, float):
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if valid:
+            value = float(value)
+    elif isinstance(default, tuple):
+        valid = (isinstance(value, (list, tuple)) and len(value) == len(default)
+            and all(isinstance(part, int) and 0 <= part <= 255 for part in value))
+        if valid:
+            value = tuple(value)
+    else:
+        valid = isinstance(value, str) and value in CHOICES.get(field, (value,))
+    if not valid:
+        raise ValueError(f"Invalid value for {field}: {value!r}")
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if value < 0 or (value == 0 and field in POSITIVE_FIELDS):
+            raise ValueError(f"{field} is out of range: {value!r}")
+
+    # A level script is read when the profile is, so a broken one can't
+    # stop the game later on, when the next fleet is made.
+    if field == 'formations' and value:
+        from formations import load_levels
+        try:
+            load_levels(value)
+        except OSError as error:
+            raise ValueError(f"Can't read formations: {error}")
+    return value
+
+class ProfileWatcher:
+    """A class to notice when a profile file changes and reload it."""
+
+    def __init__(self, path):
+        """Start watching the profile at path."""
+        self.path = path
+        self._version = self._stat()
+
+    def poll(self):
+        """Return the reloaded profile if the file has changed, else None."""
+        version = self._stat()
+        if version == self._version:
+            return None
+        self._version = version
+
+        # A half-saved or mistyped file mustn't take the game down, so the
+        # current profile stays in place until the file is valid again.
+        try:
+            return load_profile(self.path)
+        except (OSError, ValueError) as error:
+            print(f"Not reloading {self.path}: {error}", file=sys.stderr)
+            return None
+
+    def _stat(self):
+        """Return the file's modification time and size, or None."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,61 @@
+import pygame
+
+class DirtyRectRenderer:
+    """A class to repaint and push only the parts of the screen that changed."""
+
+    def __init__(self, ai_game):
+        """Initialize the renderer for the game's screen."""
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.screen_area = self.screen.get_width() * self.screen.get_height()
+
+        # What was on screen last frame, as (content, rect) pairs. The
+        # content is the image or colour drawn there, so an item that
+        # changes without moving still counts as changed.
+        self._previous = set()
+
+        # The rects to push this frame, or None for a full flip.
+        self._dirty = None
+        self._full = True
+
+    def invalidate(self):
+        """Repaint and flip the whole screen next frame."""
+        self._full = True
+
+    def begin(self, items):
+        """Clear whatever moved or changed since last frame."""
+        current = set(items)
+
+        if not self._full:
+            vacated = self._previous - current
+            arrived = current - self._previous
+            dirty = [pygame.Rect(rect) for _, rect in vacated]
+            dirty += [pygame.Rect(rect) for _, rect in arrived]
+
+            # Lots of small updates cost more than one flip once they
+            # cover enough of the screen.
+            area = sum(rect.width * rect.height for rect in dirty)
+            if area > self.settings.dirty_rect_threshold * self.screen_area:
+                self._full = True
+            else:
+                # Paint the background back over everything that left;
+                # the caller then redraws every item on top.
+                for _, rect in vacated:
+                    self.screen.fill(self.settings.bg_color, rect)
+                self._dirty = dirty
+
+        if self._full:
+            self.screen.fill(self.settings.bg_color)
+            self._dirty = None
+
+        self._previous = current
+
+    def present(self):
+        """Push this frame's changes to the display."""
+        if self._dirty is None:
+            pygame.display.flip()
+        elif self._dirty:
+            pygame.display.update(self._dirty)
+
+        # Next frame only does a full repaint if something asks for one.
+        self._full = False
@@ -0,0 +1,140 @@
+import json
+import random
+import struct
+
+import pygame
+
+from settings import Settings
+from keymap import ACTIONS
+
+# A recording is a header, a run of fixed-size input records, and a footer.
+# The header holds a magic string, the format version, the RNG seed and the
+# length of the JSON settings snapshot that follows it. Each input record
+# is (tick, kind, a, b): an ACTION record's a is the action's index in
+# ACTIONS and b whether it was pressed, a CLICK record's a and b are the
+# click's position. The END record's tick is the number of ticks the game
+# ran, and the final stats follow it.
+MAGIC = b'AIRP'
+VERSION = 2
+HEADER = struct.Struct('<4sBII')
+RECORD = struct.Struct('<IBii')
+FOOTER = struct.Struct('<qii')
+
+END, ACTION, CLICK = range(3)
+
+class InputRecorder:
+    """A class to capture a game's input stream, tick by tick."""
+
+    def __init__(self, path, settings, seed):
+        """Start a recording of a game that uses settings and seed."""
+        self.path = path
+        self.seed = seed
+        self.settings = snapshot_settings(settings)
+
+        # Records are kept in memory and written out in one go at the end.
+        self._records = bytearray()
+
+    def record_action(self, tick, action, pressed):
+        """Add an action that is about to be performed before tick."""
+        # Actions rather than keys are recorded, so a recording plays back
+        # the same however the keys were bound when it was made.
+        self._records += RECORD.pack(tick, ACTION, ACTIONS.index(action),
+            pressed)
+
+    def record_click(self, tick, pos):
+        """Add a mouse click that is about to be handled before tick."""
+        self._records += RECORD.pack(tick, CLICK, *pos)
+
+    def finish(self, ticks, stats):
+        """Write the recording with the game's final stats."""
+        settings = json.dumps(self.settings).encode()
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.seed, len(settings)))
+            f.write(settings)
+            f.write(self._records)
+            f.write(RECORD.pack(ticks, END, 0, 0))
+            f.write(FOOTER.pack(stats.score, stats.level, stats.ships_left))
+
+class Recording:
+    """A class to hold a recording read back from disk."""
+
+    def __init__(self, path):
+        """Load and unpack the recording at path."""
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        magic, version, self.seed, settings_length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an Alien Invasion recording.")
+        offset = HEADER.size
+        self.settings = json.loads(data[offset:offset + settings_length])
+        offset += settings_length
+
+        # Events are grouped by the tick they were handled before.
+        self.events = {}
+        while True:
+            tick, kind, a, b = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if kind == END:
+                self.ticks = tick
+                break
+            self.events.setdefault(tick, []).append((kind, a, b))
+
+        self.score, self.level, self.ships_left = FOOTER.unpack_from(data, offset)
+
+class ReplayResult:
+    """A class to report how a replay compared with its recording."""
+
+    def __init__(self, recording, stats):
+        """Compare the replayed stats with the recorded ones."""
+        self.expected = (recording.score, recording.level, recording.ships_left)
+        self.actual = (stats.score, stats.level, stats.ships_left)
+        self.matched = self.expected == self.actual
+
+def replay(path):
+    """Play a recording back headless and check its final stats."""
+    # The game module imports this one, so it's imported here, when needed.
+    from alien_invasion import AlienInvasion
+
+    recording = Recording(path)
+    random.seed(recording.seed)
+    settings = Settings()
+    restore_settings(settings, recording.settings)
+
+    ai = AlienInvasion(headless=True, settings=settings)
+
+    # Each tick's actions and clicks go through the same handlers as live
+    # input, just before the tick they came in ahead of. Those recorded on
+    # the final tick are the ones that ended the game, so they're left out.
+    for tick in range(recording.ticks):
+        for kind, a, b in recording.events.get(tick, ()):
+            if kind == ACTION:
+                ai.perform_action(ACTIONS[a], bool(b))
+            else:
+                ai._handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN,
+                    pos=(a, b), button=1))
+        ai._tick()
+
+    return ReplayResult(recording, ai.stats)
+
+def snapshot_settings(settings):
+    """Return the settings' plain values as a JSON-friendly dict."""
+    snapshot = {name: value for name, value in vars(settings).items()
+        if isinstance(value, (bool, int, float, str, tuple, type(None)))}
+
+    # The active profile is kept by name, so it can be rebuilt as one.
+    snapshot['active_profile'] = settings.active_profile._asdict()
+    return snapshot
+
+def restore_settings(settings, snapshot):
+    """Apply a snapshot taken by snapshot_settings() to settings."""
+    for name, value in snapshot.items():
+        # JSON turns tuples such as colours into lists.
+        if isinstance(value, list):
+            value = tuple(value)
+        elif name == 'active_profile':
+            # Settings added since the recording keep their defaults.
+            value = settings.active_profile._replace(**{field: tuple(part)
+                if isinstance(part, list) else part
+                for field, part in value.items()})
+        setattr(settings, name, value)
@@ -0,0 +1,167 @@
+"""Run many headless games in parallel to tune the game's settings.
+
+For example, `python runner.py --games 1000 --grid speedup_scale=1.1,1.2
+--grid fleet_drop_speed=5,10` plays 1000 games for each combination and
+prints the score and level distributions for each.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import mean, median
+
+from settings import PROFILE_FIELDS, Settings
+from profiles import validate_profile
+
+def idle_policy(ai, rng):
+    """Never move and never fire."""
+
+def random_policy(ai, rng):
+    """Wander and fire at random."""
+    if rng.random() < 0.05:
+        direction = rng.choice((-1, 0, 1))
+        ai.ship.moving_left = direction < 0
+        ai.ship.moving_right = direction > 0
+    if rng.random() < 0.2:
+        ai._fire_bullet()
+
+def sweep_policy(ai, rng):
+    """Sweep from wall to wall, firing whenever a bullet is free."""
+    if not ai.ship.moving_left and not ai.ship.moving_right:
+        ai.ship.moving_right = True
+    if ai.ship.rect.right >= ai.ship.screen_rect.right:
+        ai.ship.moving_left, ai.ship.moving_right = True, False
+    elif ai.ship.rect.left <= 0:
+        ai.ship.moving_left, ai.ship.moving_right = False, True
+    ai._fire_bullet()
+
+POLICIES = {
+    'idle': idle_policy,
+    'random': random_policy,
+    'sweep': sweep_policy,
+    }
+
+def play_game(overrides, seed, policy, max_ticks):
+    """Play one headless game and return its result."""
+    from alien_invasion import AlienInvasion
+
+    # Seeding both generators from the game's own seed makes every game
+    # reproducible no matter which worker ends up running it.
+    random.seed(seed)
+    rng = random.Random(seed)
+
+    # Overrides that a profile covers go through one, so starting speeds
+    # and points are validated and survive the reset at the start of a game.
+    settings = Settings(validate_profile('grid', {name: value
+        for name, value in overrides.items() if name in PROFILE_FIELDS}))
+    for name, value in overrides.items():
+        if name not in PROFILE_FIELDS:
+            setattr(settings, name, value)
+
+    ai = AlienInvasion(headless=True, settings=settings)
+    ai._start_game()
+    act = POLICIES[policy]
+    for _ in range(max_ticks):
+        if not ai.stats.game_active:
+            break
+        act(ai, rng)
+        ai._tick()
+
+    return {
+        'overrides': overrides,
+        'seed': seed,
+        'score': ai.stats.score,
+        'level': ai.stats.level,
+        'ships_left': ai.stats.ships_left,
+        'ticks': ai.ticks,
+        }
+
+def run(combinations, games, policy='random', max_ticks=36000, seed=0,
+        workers=None):
+    """Play games for every settings combination and yield each result.
+
+    Results are yielded as soon as each game finishes, not in order.
+    """
+    with ProcessPoolExecutor(max_workers=workers,
+            initializer=_init_worker) as executor:
+        futures = [executor.submit(play_game, overrides,
+                seed + index * games + game, policy, max_ticks)
+            for index, overrides in enumerate(combinations)
+            for game in range(games)]
+        for future in as_completed(futures):
+            yield future.result()
+
+def aggregate(results):
+    """Summarize score and level distributions per settings combination."""
+    groups = {}
+    for result in results:
+        key = json.dumps(result['overrides'], sort_keys=True)
+        groups.setdefault(key, []).append(result)
+
+    summary = []
+    for key, group in groups.items():
+        scores = sorted(result['score'] for result in group)
+        summary.append({
+            'overrides': json.loads(key),
+            'games': len(group),
+            'score_mean': mean(scores),
+            'score_median': median(scores),
+            'score_deciles': [scores[len(scores) * decile // 10]
+                for decile in range(10)] + [scores[-1]],
+            'levels': dict(sorted(Counter(
+                result['level'] for result in group).items())),
+            })
+    return summary
+
+def parse_grid(specs):
+    """Turn NAME=V1,V2 specs into a list of override dicts."""
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if not hasattr(Settings(), name):
+            raise ValueError(f"Unknown setting: {name}")
+        axes.append([(name, json.loads(value)) for value in values.split(',')])
+    return [dict(choice) for choice in itertools.product(*axes)]
+
+def _init_worker():
+    """Prepare a worker process to run games without a display."""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+def main(argv=None):
+    """Run the games and print each result, then the summary."""
+    parser = argparse.ArgumentParser(description="Run many Alien Invasion games.")
+    parser.add_argument('--games', type=int, default=100,
+        help="games to play for each settings combination")
+    parser.add_argument('--grid', action='append', default=[],
+        metavar='NAME=V1,V2', help="setting values to try (repeatable)")
+    parser.add_argument('--policy', choices=POLICIES, default='random')
+    parser.add_argument('--max-ticks', type=int, default=36000,
+        help="ticks after which a game is cut short")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int,
+        help="worker processes (default: one per core)")
+    parser.add_argument('--output', metavar='PATH',
+        help="write the summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    combinations = parse_grid(args.grid)
+    results = []
+    for result in run(combinations, args.games, args.policy, args.max_ticks,
+            args.seed, args.workers):
+        print(json.dumps(result), flush=True)
+        results.append(result)
+
+    summary = aggregate(results)
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == '__main__':
+    sys.exit(main())
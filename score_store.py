@@ -0,0 +1,132 @@
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+class ScoreStore:
+    """A class to keep finished games' scores on disk, off the main thread."""
+
+    def __init__(self, path, leaderboard_size=10):
+        """Open the store at path and start loading it in the background."""
+        self.path = path
+        self.leaderboard_size = leaderboard_size
+
+        # Filled in by the background thread. Until loaded is set the game
+        # simply carries on with the high score it already has.
+        self.high_score = 0
+        self.leaderboard = []
+        self.loaded = threading.Event()
+
+        # The last error the database gave, if any. A store that can't be
+        # opened or written leaves the game running without saving.
+        self.error = None
+
+        # Everything the store does goes through this queue, so the game
+        # never waits on the disk.
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def record_game(self, score, level):
+        """Queue a finished game to be saved."""
+        self._requests.put(('game', (score, level, time.time())))
+
+    def top(self, count):
+        """Return the best count games as (score, level, played_at) rows."""
+        # This waits for the background thread, so it's meant for tools
+        # and menus rather than the main loop.
+        reply = queue.Queue()
+        self._requests.put(('top', (count, reply)))
+        rows = reply.get()
+        if isinstance(rows, sqlite3.Error):
+            raise rows
+        return rows
+
+    def close(self):
+        """Save anything still queued and stop the background thread."""
+        self._requests.put(('stop', None))
+        self._thread.join()
+
+    def _run(self):
+        """Load the store, then save queued games in batches."""
+        # SQLite connections belong to the thread that opened them.
+        try:
+            connection = self._open()
+        except sqlite3.Error as error:
+            connection = None
+            self._fail(error)
+        self.loaded.set()
+
+        running = True
+        while running:
+            # Wait for one request, then take whatever else has piled up so
+            # several games can be written in a single transaction.
+            requests = [self._requests.get()]
+            while True:
+                try:
+                    requests.append(self._requests.get_nowait())
+                except queue.Empty:
+                    break
+
+            games = [args for kind, args in requests if kind == 'game']
+            if games and connection is not None:
+                # One transaction per batch: the whole batch is saved, or
+                # none of it is, and the commit is synced to disk.
+                try:
+                    with connection:
+                        connection.executemany('INSERT INTO scores '
+                            '(score, level, played_at) VALUES (?, ?, ?)', games)
+                    self._refresh(connection)
+                except sqlite3.Error as error:
+                    self._fail(error)
+
+            # Every request for the leaderboard gets an answer, even if it's
+            # only the error, so nobody is left waiting on a reply.
+            for kind, args in requests:
+                if kind == 'top':
+                    count, reply = args
+                    try:
+                        if connection is None:
+                            raise self.error
+                        reply.put(self._query_top(connection, count))
+                    except sqlite3.Error as error:
+                        reply.put(error)
+                elif kind == 'stop':
+                    running = False
+
+        if connection is not None:
+            connection.close()
+
+    def _open(self):
+        """Open the database, creating the table and index if need be."""
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.execute('PRAGMA synchronous=FULL')
+            connection.execute('CREATE TABLE IF NOT EXISTS scores ('
+                'id INTEGER PRIMARY KEY, score INTEGER NOT NULL, '
+                'level INTEGER NOT NULL, played_at REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS scores_by_score '
+                'ON scores (score DESC)')
+            connection.commit()
+            self._refresh(connection)
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return connection
+
+    def _fail(self, error):
+        """Remember a database error and report it."""
+        self.error = error
+        print(f"Not saving scores to {self.path}: {error}", file=sys.stderr)
+
+    def _refresh(self, connection):
+        """Reload the high score and leaderboard from the index."""
+        leaderboard = self._query_top(connection, self.leaderboard_size)
+        self.leaderboard = leaderboard
+        self.high_score = leaderboard[0][0] if leaderboard else 0
+
+    def _query_top(self, connection, count):
+        """Return the best count games using the score index."""
+        return connection.execute('SELECT score, level, played_at FROM scores '
+            'ORDER BY score DESC LIMIT ?', (count,)).fetchall()
@@ -1,6 +1,9 @@
-import pygame.font
-from pygame.sprite import Group
-from ship import Ship
+import pygame
+from glyphs import GlyphAtlas
+
+# The HUD is drawn through this colour, so it must not appear in any of
+# the images composited onto it.
+HUD_KEY = (255, 0, 255)
 
 class Scoreboard:
     """A class to report scoring information."""
@@ -19,8 +22,26 @@ class Scoreboard:
         # Font settings for scoring information.
         # Then we set a text color 
         self.text_color = (30,30,30)
-        # and instantiate a font object
-        self.font = pygame.font.SysFont(None, 48)
+
+        # The font and the glyphs rendered from it are only made when the
+        # scoreboard is first drawn; a headless game never needs them.
+        self.assets = ai_game.assets
+        self.font = None
+        self.glyphs = None
+
+        # The prep methods only note which images are out of date. They're
+        # rebuilt once, just before they're drawn, however many times the
+        # score changed in between.
+        self._stale = set()
+
+        # Everything the scoreboard shows, and the Play button while it's
+        # up, is composited onto a single HUD surface that's blitted once
+        # a frame. hud_rebuilds counts how often it had to be put together.
+        self.ship_icon = ai_game.assets.load_image('images/ship.bmp')
+        self.hud_image = None
+        self.hud_rect = None
+        self.hud_rebuilds = 0
+        self._button_shown = None
 
         # Prepare the initial score image.
         # To turn the text to be displayed into an image, we call prep_score() 
@@ -33,12 +54,62 @@ class Scoreboard:
         # To have Scoreboard display the current level, we call a new method, prep_level()
         self.prep_level()
 
-        # We assign the game instance to an attribute, because we’ll need it to 
-        # create some ships. We call prep_ships() after the call to prep_level().
+        # We call prep_ships() after the call to prep_level(). Nothing is
+        # rebuilt until the HUD is first drawn, by which time the game has
+        # its Play button.
         self.prep_ships()
 
-    # To turn the text to be displayed into an image 
     def prep_score(self):
+        """Mark the score image as needing a rebuild."""
+        self._stale.add('score')
+
+    def prep_high_score(self):
+        """Mark the high score image as needing a rebuild."""
+        self._stale.add('high_score')
+
+    def prep_level(self):
+        """Mark the level image as needing a rebuild."""
+        self._stale.add('level')
+
+    def prep_ships(self):
+        """Mark the remaining ships as needing a redraw."""
+        self._stale.add('ships')
+
+    # helper method
+    def _refresh(self):
+        """Rebuild whichever images have gone out of date."""
+        # The Play button is only shown while the game is inactive, so a
+        # game starting or ending changes the HUD too.
+        button_shown = not self.stats.game_active
+        stale = self._stale
+        if not stale and button_shown == self._button_shown:
+            return
+
+        if self.glyphs is None:
+            # We get a font object from the shared cache, which finds it
+            # without scanning the system's fonts. Numbers are put together
+            # from glyphs that are rendered once, so a new score doesn't
+            # mean rasterizing a new string.
+            self.font = self.assets.load_font(None, 48)
+            self.glyphs = GlyphAtlas(self.font, self.text_color,
+                self.settings.bg_color)
+
+        # The score goes first because the other two are placed relative to it.
+        if 'score' in stale:
+            self._build_score()
+        if 'high_score' in stale:
+            self._build_high_score()
+        if 'level' in stale:
+            self._build_level()
+        if 'ships' in stale:
+            self._build_ships()
+        stale.clear()
+
+        self._button_shown = button_shown
+        self._build_hud()
+
+    # To turn the text to be displayed into an image 
+    def _build_score(self):
         """Turn the score into a rendered image."""
 
         # tells Python to round the value of stats.score to the nearest 10 and store it in rounded_score.
@@ -48,12 +119,9 @@ class Scoreboard:
         # numerical value to a string: for example, to output 1,000,000 instead of 1000000.
         score_str ="{:,}".format(rounded_score)
 
-        # we turn the numerical value stats.score into a string
-        score_str = str(self.stats.score)
-
-        # and then pass this string to render(), which creates the image.
-        # To display the score clearly onscreen, we pass the screen’s background color and the text color to render().
-        self.score_image = self.font.render(score_str, True, self.text_color, self.settings.bg_color)
+        # and then pass this string to the glyph atlas, which creates the image.
+        # The atlas was rendered with the screen’s background color and the text color.
+        self.score_image = self.glyphs.render(score_str)
 
         # Display the score at the top right of the screen.
 
@@ -66,22 +134,46 @@ class Scoreboard:
         # We then place the top edge 20 pixels down from the top of the screen y.
         self.score_rect.top = 20 
     
-    # method to display the rendered score image
-    # This method draws the score image onscreen at the location score_rect specifies.
+    # method to display the rendered HUD
+    # This method draws the scores, level, ships and Play button onscreen in one blit.
     def show_score(self):
-        """Draw scores, level, and ships to the screen."""
-
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-
-        # This new line draws the level image to the screen.
-        self.screen.blit(self.level_image, self.level_rect)
-
-        # To display the ships on the screen, we call draw() on the group, and Pygame draws each ship.
-        self.ships.draw(self.screen)
-
-
-    def prep_high_score(self):
+        """Draw scores, level, ships, and the Play button to the screen."""
+        self._refresh()
+        self.screen.blit(self.hud_image, self.hud_rect)
+
+    def scene(self):
+        """Return the (image, rect) pairs show_score() draws."""
+        self._refresh()
+        return [(self.hud_image, tuple(self.hud_rect))]
+
+    # helper method
+    def _build_hud(self):
+        """Composite the scoreboard's images onto one surface."""
+        parts = [
+            (self.score_image, self.score_rect),
+            (self.high_score_image, self.high_score_rect),
+            (self.level_image, self.level_rect),
+            ]
+        parts += [(self.ship_icon, rect) for rect in self.ship_rects]
+        if self._button_shown:
+            button = self.ai_game.play_button
+            parts.append((button.image, button.rect))
+
+        # The HUD only covers the area its parts do. Everything else on it
+        # is the colour key, so whatever is under it on screen shows through.
+        self.hud_rect = parts[0][1].unionall([rect for _, rect in parts[1:]])
+        self.hud_image = pygame.Surface(self.hud_rect.size, 0, self.screen)
+        self.hud_image.fill(HUD_KEY)
+        self.hud_image.set_colorkey(HUD_KEY, pygame.RLEACCEL)
+
+        # Parts are drawn in the order the screen used to get them in, so
+        # the composite looks just as drawing them one by one did.
+        offset_x, offset_y = self.hud_rect.topleft
+        self.hud_image.blits([(image, rect.move(-offset_x, -offset_y))
+            for image, rect in parts], doreturn=False)
+        self.hud_rebuilds += 1
+
+    def _build_high_score(self):
         """Turn the high score into a rendered image."""
 
         # We round the high score to the nearest 10 and format it with commas.
@@ -89,7 +181,7 @@ class Scoreboard:
         high_score_str = "{:,}".format(high_score)
 
         # We then generate an image from the high score
-        self.high_score_image = self.font.render(high_score_str, True, self.text_color, self.settings.bg_color)
+        self.high_score_image = self.glyphs.render(high_score_str)
 
         # Center the high score at the top of the screen.
         self.high_score_rect = self.high_score_image.get_rect()
@@ -110,14 +202,14 @@ class Scoreboard:
             self.stats.high_score = self.stats.score
             self.prep_high_score()
 
-    # The prep_level() method creates an image from the value stored in stats.level
-    def prep_level(self):
+    # The _build_level() method creates an image from the value stored in stats.level
+    def _build_level(self):
         """Turn the level into a rendered image."""
 
         level_str = str(self.stats.level)
 
-        # The prep_level() method creates an image from the value stored in stats.level
-        self.level_image = self.font.render(level_str, True, self.text_color, self.settings.bg_color)
+        # The glyph atlas creates an image from the value stored in stats.level
+        self.level_image = self.glyphs.render(level_str)
 
         # Position the level below the score.
         self.level_rect = self.level_image.get_rect()
@@ -129,24 +221,22 @@ class Scoreboard:
         # the score image to leave space between the score and the level.
         self.level_rect.top = self.score_rect.bottom + 10 
 
-    # The prep_ships() method creates an empty group
-    def prep_ships(self):
-        """Show how many ships are left."""
+    # The _build_ships() method works out where each remaining ship goes.
+    def _build_ships(self):
+        """Place an icon for each ship the player has left."""
 
-        # self.ships, to hold the ship instances.
-        self.ships = Group()
+        # The icons are all the same cached ship image, so we only need their rects.
+        self.ship_rects = []
 
-        # To fill this group, a loop runs once for every ship the player has left.
+        # A loop runs once for every ship the player has left.
         for ship_number in range(self.stats.ships_left):
-            ship = Ship(self.ai_game)
+            rect = self.ship_icon.get_rect()
 
-            # Inside the loop, we create a new ship and set each ship’s x-coordinate value so the ships appear 
+            # We set each icon's x-coordinate value so the ships appear 
             # next to each other with a 10-pixel margin on the left side of the group of ships.
-            ship.rect.x = 10 + ship_number * ship.rect.width
+            rect.x = 10 + ship_number * rect.width
 
             # We set the y-coordinate value 10 pixels down from the top of the screen so the ships appear in 
             # the upper-left corner of the screen.
-            ship.rect.y = 10
-
-            # Then we add each new ship to the group ships y.
-            self.ships.add(ship)
+            rect.y = 10
+            self.ship_rects.append(rect)
@@ -1,34 +1,123 @@
+from collections import namedtuple
+
+# The settings a profile can set. A SettingsProfile holds a value for
+# each of them, plus the profile's name, as one immutable snapshot.
+PROFILE_FIELDS = (
+    'screen_width', 'screen_height', 'bg_color',
+    'tick_rate', 'max_fps', 'max_frame_time',
+    'dirty_rects', 'dirty_rect_threshold',
+    'ship_speed', 'ship_limit', 'ship_hit_pause',
+    'bullet_speed', 'bullet_width', 'bullet_hight', 'bullet_color',
+    'bullets_allowed',
+    'alien_speed', 'alien_points', 'fleet_drop_speed',
+    'fleet_backend', 'collision_broadphase', 'collision_mode', 'formations',
+    'speedup_scale', 'score_scale',
+    )
+
+SettingsProfile = namedtuple('SettingsProfile', ('name',) + PROFILE_FIELDS)
+
 class Settings:
     """A class to store all settings for Alien Invasion."""
 
-    def __init__(self):
-        """Initialize the game's settings."""
+    def __init__(self, profile=None):
+        """Initialize the game's settings, from profile if one is given."""
         # Screen settings
         self.screen_width = 1200
         self.screen_height = 800
         self.bg_color = (230,230,230)
 
+        # Timing settings
+        # The simulation advances in fixed steps of time_step seconds,
+        # tick_rate times per second, however fast the machine is.
+        # Drawing happens at most max_fps times per second (0 for no cap), and
+        # max_frame_time stops a long stall from queueing up a flood of ticks.
+        self.tick_rate = 120
+        self.time_step = 1 / self.tick_rate
+        self.max_fps = 60
+        self.max_frame_time = 0.25
+
+        # Profiling settings
+        # When profile is on, per-phase frame timings are kept for the last
+        # profile_frames frames. profile_overlay draws FPS and frame times on
+        # screen, and profile_trace names a .csv or .json file that the
+        # timings are written to when the game exits.
+        self.profile = False
+        self.profile_overlay = False
+        self.profile_frames = 600
+        self.profile_trace = None
+
+        # Rendering settings
+        # With dirty_rects on, only the regions that changed are repainted
+        # and pushed to the display. If those regions add up to more than
+        # dirty_rect_threshold of the screen, a full flip is cheaper.
+        self.dirty_rects = True
+        self.dirty_rect_threshold = 0.5
+
+        # Score settings
+        # Finished games are saved to the SQLite file named by score_store
+        # (None turns saving off), and the best leaderboard_size of them
+        # are kept ready to show.
+        self.score_store = 'scores.db'
+        self.leaderboard_size = 10
+
+        # Key settings
+        # The keys bound to each action. An action can have several keys;
+        # each key is a pygame key name.
+        self.key_bindings = {
+            'move_left': ('K_LEFT',),
+            'move_right': ('K_RIGHT',),
+            'fire': ('K_SPACE',),
+            'quit': ('K_q',),
+            'play': ('K_p',),
+            }
+
         # Ship settings 
-        # We set the initial value of ship_speed to 1.5. When the ship moves 
-        # now, its position is adjusted by 1.5 pixels rather than 1 pixel on each pass through the loop.
-        self.ship_speed = 1.5
+        # Speeds are in pixels per second. Each tick moves an object by its
+        # speed multiplied by time_step.
+        self.ship_speed = 360.0
         self.ship_limit = 3
+
+        # How long, in seconds, the game holds still after the ship is hit.
+        self.ship_hit_pause = 0.5
         
         # Bullet settings
-        self.bullet_speed = 1.5
+        self.bullet_speed = 720.0
         self.bullet_width = 3
         self.bullet_hight = 15
         self.bullet_color = (60,60,60)
         self.bullets_allowed = 3
 
         # Alien settings
-        self.alien_speed = 1.0
+        self.alien_speed = 240.0
+        self.alien_points = 50
 
         # The setting fleet_drop_speed controls how quickly the fleet drops down the screen each time 
         # an alien reaches either edge. It’s helpful to separate
         # this speed from the aliens’ horizontal speed so you can adjust the two speeds independently.
         self.fleet_drop_speed = 5 # 10
 
+        # Which fleet implementation to use: 'sprites' moves each alien
+        # with its own update() call, 'numpy' keeps positions in arrays
+        # and moves the whole fleet at once (falls back to 'sprites' if
+        # NumPy isn't installed).
+        self.fleet_backend = 'sprites'
+
+        # Use a spatial hash to find bullet-alien collisions instead of
+        # testing every bullet against every alien.
+        self.collision_broadphase = True
+
+        # 'discrete' tests where each bullet is after a tick. 'swept' tests
+        # the whole path it moved along, so a bullet moving further than an
+        # alien's height in one tick can't pass straight through it. Swept
+        # tests always go through the spatial hash.
+        self.collision_mode = 'discrete'
+
+        # A level script, such as 'formations/levels.json', naming the
+        # formation each level's fleet flies in. Formations are moved by
+        # the numpy backend whenever NumPy is installed. An empty string
+        # keeps the classic grid on every level.
+        self.formations = ''
+
         # How quickly the game speeds up
         # we add a speedup_scale setting to control how quickly the game speeds up
         # If the game becomes too difficult too quickly, decrease the value of settings.speedup_scale. 
@@ -39,6 +128,17 @@ class Settings:
         # We define a rate at which points increase, which we call score_scale.
         self.score_scale = 1.5
 
+        # The values above make up the default profile. A profile passed in
+        # replaces them, and active_profile remembers which one we started
+        # from, since the speeds and points change as the game goes on.
+        if profile is None:
+            profile = self.snapshot('default')
+        else:
+            for name in PROFILE_FIELDS:
+                setattr(self, name, getattr(profile, name))
+            self.time_step = 1 / self.tick_rate
+        self.active_profile = profile
+
         # we call the initialize_dynamic_settings() method to initialize 
         # the values for attributes that need to change throughout the game.
         self.initialize_dynamic_settings()
@@ -59,9 +159,11 @@ class Settings:
     # We don’t need to increase the value of fleet_drop_speed,because when the aliens move faster across the screen, they’ll also come down the screen faster.
     def initialize_dynamic_settings(self):
         """Initialize settings that change throughout the game."""
-        self.ship_speed = 1.5
-        self.bullet_speed = 3.0
-        self.alien_speed = 1.0
+        # The starting speeds and points come from the active profile.
+        profile = self.active_profile
+        self.ship_speed = profile.ship_speed
+        self.bullet_speed = profile.bullet_speed
+        self.alien_speed = profile.alien_speed
 
         # fleet_direction of 1 represents right; -1 represents left.
         self.fleet_direction = 1
@@ -69,7 +171,7 @@ class Settings:
         # Scoring
         # We’ll increase each alien’s point value as the game progresses. To make sure this point value is reset each time a new game starts, 
         # we set the value in initialize_dynamic_settings().
-        self.alien_points = 50
+        self.alien_points = profile.alien_points
 
     # To increase the speed of these game elements, 
     # we multiply each speed setting by the value of speedup_scale.
@@ -82,4 +184,30 @@ class Settings:
         # when we increase the game’s speed, we also increase the point value of each hit.
         # We use the int() function to increase the point value by whole integers.
         self.alien_points = int(self.alien_points * self.score_scale)
-        
\ No newline at end of file
+
+    def snapshot(self, name):
+        """Return the current profile settings as a SettingsProfile."""
+        return SettingsProfile(name, *(getattr(self, field)
+            for field in PROFILE_FIELDS))
+
+    def apply_profile(self, profile):
+        """Switch to profile's values in the middle of a game."""
+        old = self.active_profile
+
+        # The speeds and points have been scaled up level by level since
+        # the game started, so they're scaled by how much their starting
+        # values changed rather than reset.
+        ship_speed = self.ship_speed * profile.ship_speed / old.ship_speed
+        bullet_speed = self.bullet_speed * profile.bullet_speed / old.bullet_speed
+        alien_speed = self.alien_speed * profile.alien_speed / old.alien_speed
+        alien_points = int(self.alien_points * profile.alien_points / old.alien_points)
+
+        for name in PROFILE_FIELDS:
+            setattr(self, name, getattr(profile, name))
+        self.time_step = 1 / self.tick_rate
+        self.active_profile = profile
+
+        self.ship_speed = ship_speed
+        self.bullet_speed = bullet_speed
+        self.alien_speed = alien_speed
+        self.alien_points = alien_points
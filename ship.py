@@ -1,4 +1,3 @@
-import pygame
 from pygame.sprite import Sprite
 
 class Ship(Sprite):
@@ -22,7 +21,8 @@ class Ship(Sprite):
 
         # Load the ship image and get its rect.
         # Double slash because windows issue with file slash 
-        self.image = pygame.image.load('images/ship.bmp')
+        # The shared asset cache hands every ship the same surface.
+        self.image = ai_game.assets.load_image('images/ship.bmp')
 
         # When the image is loaded, we call get_rect() to access the ship surface’s rect attribute so we can later use it to place the ship.
         self.rect = self.image.get_rect()
@@ -51,12 +51,12 @@ class Ship(Sprite):
         # If this value is less than the value returned by self.screen 
         # rect.right, the ship hasn’t reached the right edge of the screen
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += self.settings.ship_speed * self.settings.time_step
 
         # The same goes for the left edge: if the value of the left side of the rect is greater than 
         # zero, the ship hasn’t reached the left edge of the screen
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= self.settings.ship_speed * self.settings.time_step
         
         # Update rect object from self.x.
         self.rect.x = self.x
@@ -0,0 +1,69 @@
+"""Time how long the game takes to start, and which imports that time goes on.
+
+Usage: python alien_invasion.py --startup-trace
+"""
+
+import json
+import subprocess
+import sys
+import time
+
+def parse_importtime(text):
+    """Return (module, self_us, cumulative_us, depth) for each -X importtime line."""
+    imports = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The header line, or something else written to stderr.
+            continue
+
+        # Nested imports are indented two spaces per level under the
+        # module that imported them.
+        name = fields[2]
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return imports
+
+def cold_start(args=(), env=None, importtime=False):
+    """Start the game in a fresh interpreter and time it to its first flip."""
+    # The child builds the game, which puts its loading screen on the
+    # display, then reports when that happened and exits.
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-m', 'alien_invasion', '--first-frame', *args]
+
+    spawned = time.time()
+    child = subprocess.run(command, env=env, capture_output=True, text=True)
+    if child.returncode != 0:
+        raise RuntimeError(f"The game failed to start:\n{child.stderr}")
+    startup = json.loads(child.stdout.splitlines()[-1])
+
+    # Wall-clock time, as the one clock both processes share.
+    result = {
+        'cold_start_ms': (startup['flipped_at'] - spawned) * 1000,
+        'first_frame_ms': startup['first_frame'] * 1000,
+        }
+    return result, parse_importtime(child.stderr)
+
+def report(result, imports, top=20):
+    """Print the startup times and the costliest top-level imports."""
+    print(f"cold start to first flip: {result['cold_start_ms']:.1f} ms "
+        f"(game setup {result['first_frame_ms']:.1f} ms)")
+
+    # Only imports made directly by the game are listed; what they pulled
+    # in themselves is part of their cumulative time.
+    direct = [entry for entry in imports if entry[3] == 0]
+    total = sum(entry[2] for entry in direct)
+    print(f"imports: {total / 1000:.1f} ms")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for name, own, cumulative, depth in sorted(direct,
+            key=lambda entry: entry[2], reverse=True)[:top]:
+        print(f"{cumulative / 1000:>9.1f} ms {own / 1000:>7.1f} ms  {name}")
+
+def main(args=()):
+    """Trace a cold start of the game with args and print the report."""
+    result, imports = cold_start(args, importtime=True)
+    report(result, imports)
@@ -0,0 +1,24 @@
+import os
+import sys
+
+# The game's modules live at the top of the repository, and the tests
+# never open a window.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+import pytest
+
+@pytest.fixture
+def game_dir(tmp_path, monkeypatch):
+    """Run the test from a folder with stand-ins for the game's images."""
+    # The game loads its images from images/ under the working directory,
+    # and they aren't part of the repository. These have the real sizes.
+    (tmp_path / 'images').mkdir()
+    for name, size in (('ship', (60, 48)), ('alien', (60, 58))):
+        image = pygame.Surface(size)
+        image.fill((200, 200, 200))
+        pygame.image.save(image, str(tmp_path / 'images' / f'{name}.bmp'))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
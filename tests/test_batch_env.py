@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from alien_invasion import AlienInvasion
+from batch_env import BatchAlienInvasion, FIRE, LEFT, RIGHT
+from settings import Settings
+
+def make_settings():
+    """Return settings whose fleets drop fast enough to reach the ships."""
+    settings = Settings()
+    settings.fleet_drop_speed = 20
+    return settings
+
+def action_stream(games, ticks, seed=3):
+    """Return a (ticks, games) array of sticky random actions."""
+    # Each game holds a direction for a while and fires now and then, so
+    # the ships roam the screen and the fleets get shot at.
+    rng = np.random.default_rng(seed)
+    actions = np.zeros((ticks, games), dtype=np.int64)
+    held = np.zeros(games, dtype=np.int64)
+    for tick in range(ticks):
+        change = rng.random(games) < 0.02
+        held = np.where(change, rng.choice([0, LEFT, RIGHT], games), held)
+        actions[tick] = held | np.where(rng.random(games) < 0.1, FIRE, 0)
+    return actions
+
+def play_scalar(actions):
+    """Play one headless game through the action stream; return its stats."""
+    ai = AlienInvasion(headless=True, settings=make_settings())
+    ai.perform_action('play')
+    for action in actions.tolist():
+        if not ai.stats.game_active:
+            break
+        ai.perform_action('move_left', bool(action & LEFT))
+        ai.perform_action('move_right', bool(action & RIGHT))
+        if action & FIRE:
+            ai.perform_action('fire')
+        ai._tick()
+    return ai.stats.score, ai.stats.level, ai.stats.ships_left
+
+def test_batch_matches_scalar_game(game_dir):
+    """Every batched game ends with exactly the scalar game's stats."""
+    games, ticks = 3, 12000
+    actions = action_stream(games, ticks)
+
+    env = BatchAlienInvasion(games, make_settings())
+    for tick in range(ticks):
+        env.step(actions[tick])
+    batched = [(int(env.score[game]), int(env.level[game]),
+        int(env.ships_left[game])) for game in range(games)]
+
+    scalar = [play_scalar(actions[:, game]) for game in range(games)]
+    assert batched == scalar
+
+    # The stream has to clear fleets and lose ships for this to count.
+    assert any(level > 1 for _, level, _ in scalar)
+    assert any(ships_left < 3 for _, _, ships_left in scalar)
@@ -0,0 +1,183 @@
+import random
+from types import SimpleNamespace
+
+import pygame
+import pytest
+
+from bullet import BulletPool
+from collisions import SpatialHash
+from fleet import VectorFleet
+from settings import Settings
+
+SCREEN_SIZE = (800, 600)
+ALIEN_SIZE = (40, 30)
+
+def make_game(bullets_allowed=8, bullet_speed=720.0):
+    """Return a stand-in for AlienInvasion with just what the tests need."""
+    settings = Settings()
+    settings.bullets_allowed = bullets_allowed
+    settings.bullet_speed = bullet_speed
+    return SimpleNamespace(settings=settings,
+        screen=pygame.Surface(SCREEN_SIZE),
+        ship=SimpleNamespace(rect=pygame.Rect(380, 570, 40, 30)))
+
+def make_fleet(game, vector, layout):
+    """Return a fleet of aliens drawn from a synthetic surface."""
+    image = pygame.Surface(ALIEN_SIZE)
+    aliens = []
+    for x, y in layout:
+        alien = pygame.sprite.Sprite()
+        alien.image = image
+        alien.rect = image.get_rect(topleft=(x, y))
+        alien.x = float(x)
+        aliens.append(alien)
+
+    if vector:
+        fleet = VectorFleet(game)
+        fleet.populate(aliens, tuple(layout))
+    else:
+        fleet = pygame.sprite.Group(aliens)
+    return fleet, aliens
+
+def grid(columns, rows, left=40, top=30):
+    """Return the (x, y) of a grid spaced one alien apart."""
+    width, height = ALIEN_SIZE
+    return [(left + 2 * width * column, top + 2 * height * row)
+        for row in range(rows) for column in range(columns)]
+
+def fire_at(game, pool, x, y):
+    """Launch a bullet from the pool with its midtop at (x, y)."""
+    game.ship.rect.midtop = (x, y)
+    pool.fire()
+
+def move_fleet(game, fleet, vector):
+    """Move the fleet one tick the way the game does, turning at the edges."""
+    settings = game.settings
+    sprites = fleet.sprites()
+    if vector:
+        left, right, _ = fleet.extent()
+    else:
+        left = min(alien.rect.left for alien in sprites)
+        right = max(alien.rect.right for alien in sprites)
+    if right >= SCREEN_SIZE[0] or left <= 0:
+        if vector:
+            fleet.drop()
+        else:
+            for alien in sprites:
+                alien.rect.y += settings.fleet_drop_speed
+        settings.fleet_direction *= -1
+
+    if vector:
+        fleet.update()
+    else:
+        for alien in sprites:
+            alien.x += (settings.alien_speed * settings.time_step
+                * settings.fleet_direction)
+            alien.rect.x = alien.x
+
+def run_frames(collide, vector, frames=240, seed=1, bullet_speed=720.0):
+    """Play a scripted sequence of frames and return every frame's hits.
+
+    Hits are given as (bullet number, [alien numbers]), so two runs can be
+    compared even though they hold different objects.
+    """
+    random.seed(seed)
+    game = make_game(bullet_speed=bullet_speed)
+    pool = BulletPool(game)
+    fleet, aliens = make_fleet(game, vector, grid(8, 4))
+    number = {alien: index for index, alien in enumerate(aliens)}
+
+    results = []
+    for frame in range(frames):
+        fire_at(game, pool, random.randrange(SCREEN_SIZE[0]), 570)
+        pool.update()
+        bullets = pool.sprites()
+        hits = collide(pool, fleet)
+        results.append(sorted((bullets.index(bullet),
+            [number[alien] for alien in hit]) for bullet, hit in hits.items()))
+        pool.cull()
+        move_fleet(game, fleet, vector)
+    return results
+
+def brute_force(bullets, aliens):
+    """Collide every bullet with every alien, as the game can."""
+    # The vector fleet's rects have to be written first; the spatial hash
+    # asks for the ones it needs itself.
+    if isinstance(aliens, VectorFleet):
+        aliens.sync_rects()
+    return pygame.sprite.groupcollide(bullets, aliens, True, True)
+
+@pytest.mark.parametrize('vector', [False, True], ids=['sprites', 'numpy'])
+def test_spatial_hash_matches_groupcollide(vector):
+    """The spatial hash finds exactly the hits groupcollide() finds."""
+    expected = run_frames(brute_force, vector)
+    broadphase = SpatialHash()
+    actual = run_frames(lambda bullets, aliens: broadphase.groupcollide(
+        bullets, aliens, True, True), vector)
+
+    assert actual == expected
+    # The script has to actually shoot something for the test to count.
+    assert sum(len(hits) for hits in expected) > 10
+
+def test_spatial_hash_keeps_group_order():
+    """A bullet overlapping several aliens gets them in group order."""
+    game = make_game()
+    pool = BulletPool(game)
+    fleet, aliens = make_fleet(game, False, [(100, 100), (100, 110)])
+    fire_at(game, pool, 120, 100)
+
+    hits = SpatialHash().groupcollide(pool, fleet, False, False)
+    assert list(hits.values()) == [aliens]
+
+# At 120 ticks a second, 1800 pixels a second moves a bullet exactly its
+# own 15 pixel height each tick.
+@pytest.mark.parametrize('bullet_speed', [360.0, 720.0, 1800.0])
+@pytest.mark.parametrize('vector', [False, True], ids=['sprites', 'numpy'])
+def test_swept_matches_discrete_at_low_speed(vector, bullet_speed):
+    """A bullet that moves no more than its height a tick hits the same aliens."""
+    discrete = run_frames(lambda bullets, aliens: SpatialHash().groupcollide(
+        bullets, aliens, True, True), vector, 480, bullet_speed=bullet_speed)
+    swept = run_frames(lambda bullets, aliens: SpatialHash().groupcollide(
+        bullets, aliens, True, True, swept=True), vector, 480,
+        bullet_speed=bullet_speed)
+
+    assert swept == discrete
+    assert sum(len(hits) for hits in discrete) > 10
+
+def fast_shot(swept):
+    """Return the hits from one bullet that jumps 60 pixels over an alien."""
+    # 7200 pixels a second is 60 pixels a tick, twice the alien's height.
+    game = make_game(bullet_speed=7200.0)
+    pool = BulletPool(game)
+    fleet, aliens = make_fleet(game, False, [(100, 100)])
+    fire_at(game, pool, 120, 140)
+    pool.update()
+    return SpatialHash().groupcollide(pool, fleet, True, True, swept), aliens
+
+def test_fast_bullet_passes_through_when_discrete():
+    """A bullet past the alien by the end of the tick misses it."""
+    hits, aliens = fast_shot(swept=False)
+    assert hits == {}
+    assert aliens[0].alive()
+
+def test_fast_bullet_hits_when_swept():
+    """The swept test catches the alien the bullet passed through."""
+    hits, aliens = fast_shot(swept=True)
+    assert list(hits.values()) == [aliens]
+    assert not aliens[0].alive()
+
+def test_swept_hits_lowest_alien_on_path():
+    """Only the first alien on the bullet's way up is hit."""
+    game = make_game(bullet_speed=14400.0)
+    pool = BulletPool(game)
+    upper, lower, beside = (100, 100), (100, 160), (110, 160)
+    fleet, aliens = make_fleet(game, False, [upper, lower, beside])
+    fire_at(game, pool, 130, 200)
+    pool.update()
+
+    hits = SpatialHash().groupcollide(pool, fleet, True, True, swept=True)
+
+    # lower and beside are level, so the tie goes to lower, first in the
+    # group; upper, further along the path, survives.
+    assert list(hits.values()) == [[aliens[1]]]
+    assert aliens[0].alive() and aliens[2].alive()
@@ -0,0 +1,121 @@
+import random
+from types import SimpleNamespace
+
+import pygame
+import pytest
+
+from fleet import FleetBounds, VectorFleet
+from settings import Settings
+
+SCREEN_SIZE = (800, 600)
+ALIEN_SIZE = (40, 30)
+
+def make_fleet(vector, columns=8, rows=4):
+    """Return a game stand-in, a fleet on a grid and the grid's layout."""
+    settings = Settings()
+    settings.alien_speed = 2400.0
+    settings.fleet_drop_speed = 60
+    game = SimpleNamespace(settings=settings,
+        screen=pygame.Surface(SCREEN_SIZE))
+
+    width, height = ALIEN_SIZE
+    layout = tuple((width + 2 * width * column, height + 2 * height * row)
+        for row in range(rows) for column in range(columns))
+    image = pygame.Surface(ALIEN_SIZE)
+    aliens = []
+    for x, y in layout:
+        alien = pygame.sprite.Sprite()
+        alien.image = image
+        alien.rect = image.get_rect(topleft=(x, y))
+        alien.x = float(x)
+        aliens.append(alien)
+
+    if vector:
+        fleet = VectorFleet(game)
+        fleet.populate(aliens, layout)
+    else:
+        fleet = pygame.sprite.Group(aliens)
+    return game, fleet, aliens, layout
+
+def brute_force(game, fleet, vector):
+    """Return (at_edge, at_bottom) from every live alien's rect."""
+    if vector:
+        fleet.sync_rects()
+    screen_rect = game.screen.get_rect()
+    at_edge = any(alien.rect.right >= screen_rect.right or alien.rect.left <= 0
+        for alien in fleet)
+    at_bottom = any(alien.rect.bottom >= screen_rect.bottom for alien in fleet)
+    return at_edge, at_bottom
+
+def step(game, fleet, vector, bounds):
+    """Move the fleet one tick, turning and dropping when bounds say so."""
+    settings = game.settings
+    if bounds.at_edge():
+        if vector:
+            fleet.drop()
+        else:
+            for alien in fleet:
+                alien.rect.y += settings.fleet_drop_speed
+        settings.fleet_direction *= -1
+
+    if vector:
+        fleet.update()
+    else:
+        for alien in fleet:
+            alien.x += (settings.alien_speed * settings.time_step
+                * settings.fleet_direction)
+            alien.rect.x = alien.x
+
+@pytest.mark.parametrize('vector', [False, True], ids=['sprites', 'numpy'])
+def test_bounds_match_brute_force(vector):
+    """Edge and bottom checks agree with a full scan as the outside dies."""
+    game, fleet, aliens, layout = make_fleet(vector)
+    bounds = FleetBounds(game)
+    bounds.reset(aliens, layout, fleet if vector else None)
+
+    # The outer columns and the bottom row go first, one alien at a time,
+    # so the stand-ins have to move inwards again and again; then the
+    # rest die in a shuffled order.
+    columns, rows = 8, 4
+    outside = ([row * columns for row in range(rows)]
+        + [row * columns + columns - 1 for row in range(rows)]
+        + [(rows - 1) * columns + column for column in range(columns)]
+        + [row * columns + 1 for row in range(rows)])
+    order = list(dict.fromkeys(outside))
+    rest = [index for index in range(len(aliens)) if index not in order]
+    random.Random(3).shuffle(rest)
+    order += rest
+
+    seen = set()
+    for index in order:
+        alien = aliens[index]
+        alien.kill()
+        bounds.remove(alien)
+
+        # A few ticks between kills carry the fleet to the edges.
+        for _ in range(6):
+            expected = brute_force(game, fleet, vector)
+            assert (bounds.at_edge(), bounds.at_bottom()) == expected
+            seen.add(expected)
+            step(game, fleet, vector, bounds)
+
+    assert not fleet
+    assert (bounds.at_edge(), bounds.at_bottom()) == (False, False)
+    # The fleet has to have actually reached the edges for this to count.
+    assert any(at_edge for at_edge, _ in seen)
+    assert any(at_bottom for _, at_bottom in seen)
+
+def test_vector_fleet_empties_and_refills():
+    """An emptied vector fleet can be filled again from the same pool."""
+    game, fleet, aliens, layout = make_fleet(True)
+    aliens[3].kill()
+    fleet.update()
+    fleet.empty()
+    assert not fleet
+    assert not any(alien.alive() for alien in aliens)
+
+    fleet.populate(aliens, layout)
+    assert len(fleet) == len(aliens)
+    assert all(alien.alive() for alien in aliens)
+    fleet.sync_rects()
+    assert [tuple(alien.rect.topleft) for alien in aliens] == list(layout)
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from alien_invasion import AlienInvasion
+from formations import compile_formation, formation_for_level, load_formation
+from settings import Settings
+
+LEVELS = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'formations', 'levels.json')
+
+def test_sparse_formation_falls_back_to_full_grid(game_dir):
+    """A pattern with no 'X' on a small screen's grid still makes a fleet."""
+    settings = Settings()
+    settings.screen_width, settings.screen_height = 500, 400
+    settings.formations = LEVELS
+    ai = AlienInvasion(headless=True, settings=settings)
+
+    # Level 5 is the diamond, whose 'X's all miss the 3 by 1 grid.
+    spec = formation_for_level(LEVELS, 5)
+    assert spec.name == 'diamond'
+    ai.stats.level = 5
+    ai._create_fleet()
+
+    assert len(ai.aliens) == 3
+    ai.run_frames(120)
+
+@pytest.mark.parametrize('text', ['[1]', '{"motion": 5}', '{"motion": [1]}',
+    '{"motion": [{"kind": "wave", "period": "fast"}]}'])
+def test_bad_formation_is_a_value_error(tmp_path, text):
+    """Malformed formation files raise ValueError, which a reload reports."""
+    path = tmp_path / 'bad.json'
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        load_formation(str(path))
+
+def test_formation_on_a_screen_too_small_for_aliens():
+    """A screen with no room for the grid gives an empty layout, not an error."""
+    spec = formation_for_level(LEVELS, 2)
+    assert compile_formation(spec, 100, 100, 60, 58, 48).layout == ()
@@ -0,0 +1,39 @@
+import random
+
+import pygame
+
+from alien_invasion import AlienInvasion
+from replay import InputRecorder, replay
+
+def test_recording_replays_to_the_same_stats(game_dir):
+    """A scripted game replayed from its recording ends the same way."""
+    path = str(game_dir / 'game.airp')
+    seed = 7
+    random.seed(seed)
+    ai = AlienInvasion(headless=True)
+    ai.recorder = InputRecorder(path, ai.settings, seed)
+
+    # The game starts with a click on Play, as a player would start it,
+    # after a few idle ticks so the click isn't on the first one.
+    for _ in range(5):
+        ai._tick()
+    ai._handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN,
+        pos=ai.play_button.rect.center, button=1))
+    assert ai.stats.game_active
+
+    # Then the ship sweeps back and forth, firing as it goes.
+    script = random.Random(1)
+    for tick in range(3000):
+        if tick % 240 == 0:
+            ai.perform_action('move_right', tick % 480 == 0)
+            ai.perform_action('move_left', tick % 480 != 0)
+        if script.random() < 0.2:
+            ai.perform_action('fire')
+        ai._tick()
+    ai.close()
+    assert ai.stats.score > 0
+
+    result = replay(path)
+    assert result.matched
+    assert result.actual == (ai.stats.score, ai.stats.level,
+        ai.stats.ships_left)
@@ -0,0 +1,30 @@
+import sqlite3
+
+import pytest
+
+from score_store import ScoreStore
+
+def test_scores_are_saved_and_ranked(tmp_path):
+    """Recorded games come back best first, and survive reopening."""
+    path = str(tmp_path / 'scores.db')
+    store = ScoreStore(path)
+    for score in (50, 300, 120):
+        store.record_game(score, 1)
+    assert [row[0] for row in store.top(2)] == [300, 120]
+    store.close()
+
+    store = ScoreStore(path)
+    store.loaded.wait()
+    assert store.high_score == 300
+    store.close()
+
+def test_unopenable_store_fails_instead_of_hanging(tmp_path):
+    """A database that can't be opened raises from top() and still closes."""
+    # A folder that doesn't exist can't hold the database file.
+    store = ScoreStore(str(tmp_path / 'missing' / 'scores.db'))
+    store.record_game(100, 2)
+    with pytest.raises(sqlite3.Error):
+        store.top(5)
+    assert store.loaded.is_set()
+    assert store.high_score == 0
+    store.close()